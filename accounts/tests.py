@@ -1,3 +1,55 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from bookings.models import Booking, BookingEvent, hour_choices
+from bookings.tests import make_booking, make_service, make_user
 
-# Create your tests here.
+
+class EditBookingTests(TestCase):
+    """Customers changing their own bookings from the account page."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.service = make_service()
+        self.client.force_login(self.user)
+
+    def edit(self, booking, **fields):
+        data = {
+            "form_name": "edit_booking",
+            "booking_id": booking.pk,
+            "service": booking.service_id,
+            "breed_size": booking.breed_size,
+            "notes": booking.notes,
+        }
+        data.update(fields)
+        return self.client.post(reverse("accounts:account"), data)
+
+    def test_edit_is_recorded_against_the_customer(self):
+        booking = make_booking(
+            self.user, self.service, timezone.localdate() + timedelta(days=7), hour_choices(9, 9)[0][0],
+        )
+        response = self.edit(booking, breed_size=Booking.BreedSize.LARGE)
+
+        self.assertRedirects(response, reverse("accounts:account"), fetch_redirect_response=False)
+        booking.refresh_from_db()
+        self.assertEqual(booking.breed_size, Booking.BreedSize.LARGE)
+        self.assertEqual(booking.price_snapshot, self.service.price_large)
+        event = BookingEvent.objects.filter(booking=booking, kind=BookingEvent.Kind.UPDATED).get()
+        self.assertEqual(event.actor, self.user)
+
+    def test_past_booking_cannot_be_edited(self):
+        booking = make_booking(
+            self.user, self.service, timezone.localdate() - timedelta(days=7), hour_choices(9, 9)[0][0],
+        )
+        self.edit(booking, breed_size=Booking.BreedSize.LARGE)
+        booking.refresh_from_db()
+        self.assertEqual(booking.breed_size, Booking.BreedSize.SMALL)
+
+    def test_other_customers_bookings_are_not_found(self):
+        booking = make_booking(
+            make_user("other@example.com"), self.service,
+            timezone.localdate() + timedelta(days=7), hour_choices(9, 9)[0][0],
+        )
+        response = self.edit(booking, breed_size=Booking.BreedSize.LARGE)
+        self.assertEqual(response.status_code, 404)
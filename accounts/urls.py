@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import register, EmailLoginView, EmailLogoutView, account_dashboard
+from .views import register, EmailLoginView, EmailLogoutView, account_dashboard, account_bookings_more
 
 app_name = "accounts"
 
@@ -8,4 +8,5 @@ urlpatterns = [
     path("login/",    EmailLoginView.as_view(),  name="login"),
     path("logout/",   EmailLogoutView.as_view(), name="logout"),
     path("account/", account_dashboard, name="account"),
+    path("account/bookings/", account_bookings_more, name="account_bookings"),
 ]
@@ -3,12 +3,23 @@ from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.views.decorators.http import require_GET
 from .forms import RegistrationForm, EmailAuthenticationForm, ProfileUpdateForm, DeleteAccountForm
 from bookings.forms import BookingUpdateForm
 from bookings.models import Booking
+from archive.history import booking_history_page
+from core.pagination import InvalidCursor, keyset_page
+
+# Account booking lists
+BOOKINGS_PAGE_SIZE = 10
+BOOKING_PAGE_KEYS = ("date", "time", "id")
+BOOKING_LIST_TEMPLATES = {
+    "upcoming": "accounts/partials/upcoming_booking_items.html",
+    "previous": "accounts/partials/previous_booking_items.html",
+}
 
 
 def register(request):
@@ -46,19 +57,6 @@ def account_dashboard(request):
     password_form = PasswordChangeForm(user=user)
     delete_form = DeleteAccountForm()
 
-    # Split bookings
-    # now = timezone.localtime(timezone.now())
-
-    # Upcoming - confirmed & not past (chronological)
-    upcoming_qs = Booking.objects.filter(user=user, status=Booking.Status.CONFIRMED).order_by("date", "time")
-    upcoming = [b for b in upcoming_qs if not b.is_past]
-
-    # Previous & Cancelled - completed or cancelled (newest first)
-    previous_cancelled = Booking.objects.filter(
-        user=user,
-        status__in=[Booking.Status.COMPLETED, Booking.Status.CANCELLED]
-    ).order_by("-date", "-time")
-
     # Handle GET edit modal
     edit_id = request.GET.get("edit")
     editing = None
@@ -103,16 +101,56 @@ def account_dashboard(request):
                 return redirect("accounts:account")
             edit_form = BookingUpdateForm(request.POST, instance=editing)
             if edit_form.is_valid():
+                edit_form.instance.event_actor = request.user
                 edit_form.save()
                 messages.success(request, "Booking updated." , extra_tags="bookings")
                 return redirect("accounts:account")
 
+    # Bookings are only queried when the page is rendered, one page each
     return render(request, "accounts/account.html", {
         "profile_form": profile_form,
         "password_form": password_form,
         "delete_form": delete_form,
-        "upcoming": upcoming,
-        "previous_cancelled": previous_cancelled,
+        "upcoming": booking_list_page(user, "upcoming"),
+        "previous_cancelled": booking_list_page(user, "previous"),
         "editing": editing,
         "edit_form": edit_form,
     })
+
+
+def booking_list_page(user, list_name, cursor=None):
+    """
+    One keyset page of the user's bookings over (date, time, id).
+    - upcoming: confirmed & not past (chronological)
+    - previous: completed or cancelled, archived included (newest first)
+    """
+    if list_name != "upcoming":
+        # Older finished bookings may have moved to the archive table
+        return booking_history_page(user, cursor, BOOKINGS_PAGE_SIZE)
+    qs = Booking.objects.filter(user=user, status=Booking.Status.CONFIRMED).upcoming()
+    return keyset_page(
+        qs.select_related("service"),
+        BOOKING_PAGE_KEYS,
+        cursor=cursor,
+        size=BOOKINGS_PAGE_SIZE,
+    )
+
+
+@login_required
+@require_GET
+def account_bookings_more(request):
+    """Next page of an account booking list as rendered rows (JSON)."""
+    list_name = request.GET.get("list")
+    if list_name not in BOOKING_LIST_TEMPLATES:
+        return JsonResponse({"success": False, "error": "Unknown list."}, status=400)
+    try:
+        page = booking_list_page(request.user, list_name, request.GET.get("cursor"))
+    except InvalidCursor:
+        return JsonResponse({"success": False, "error": "Invalid cursor."}, status=400)
+
+    html = render(
+        request,
+        BOOKING_LIST_TEMPLATES[list_name],
+        {"bookings": page.items},
+    ).content.decode("utf-8")
+    return JsonResponse({"success": True, "html": html, "next": page.next_cursor})
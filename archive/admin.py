@@ -0,0 +1,21 @@
+from django.contrib import admin
+from .models import ArchiveRun
+
+
+@admin.register(ArchiveRun)
+class ArchiveRunAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "cutoff", "moved", "started_at", "finished_at")
+    list_filter = ("kind", "status")
+
+    # Runs are written by the archive_records command only
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
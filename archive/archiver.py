@@ -0,0 +1,123 @@
+"""
+Tiered retention: move old, finished rows into the compact archive tables.
+
+Completed or cancelled bookings and handled (read or archived) messages
+leave their hot tables once older than the configured age. Each batch
+copies its rows, deletes them and advances the run's checkpoint in one
+transaction, so a stopped run resumes where it left off and no row is
+copied twice.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from bookings.availability import refresh_days
+from bookings.models import ArchivedBooking, Booking
+from contact import inbox
+from contact.models import ArchivedMessage, ContactMessage
+from .models import ArchiveRun
+
+ARCHIVE_BATCH_SIZE = 1000
+
+FINISHED_STATUSES = (Booking.Status.COMPLETED, Booking.Status.CANCELLED)
+
+
+def booking_candidates(cutoff):
+    """Finished bookings whose slot started before cutoff."""
+    return (
+        Booking.objects
+        .filter(status__in=FINISHED_STATUSES, starts_at__lt=cutoff)
+        .select_related("service")
+    )
+
+
+def message_candidates(cutoff):
+    """Read or archived messages received before cutoff."""
+    return ContactMessage.objects.filter(
+        Q(is_read=True) | Q(is_archived=True),
+        created_at__lt=cutoff,
+    )
+
+
+def move_bookings(rows):
+    ArchivedBooking.objects.bulk_create([ArchivedBooking.from_booking(b) for b in rows])
+    # Archived bookings keep their stats and events, so the per-row delete
+    # signals must not run; the day index is refreshed once per batch
+    Booking.objects.filter(pk__in=[b.pk for b in rows])._raw_delete(Booking.objects.db)
+    refresh_days({b.date for b in rows})
+
+
+def move_messages(rows):
+    ArchivedMessage.objects.bulk_create([ArchivedMessage.from_message(m) for m in rows])
+    changes = dict.fromkeys(inbox.COUNTERS, 0)
+    for m in rows:
+        for name, value in inbox.counter_values(m.is_read, m.is_archived).items():
+            changes[name] -= value
+    # One counter update per batch instead of the per-row delete signal
+    ContactMessage.objects.filter(pk__in=[m.pk for m in rows])._raw_delete(ContactMessage.objects.db)
+    inbox.bump(changes)
+
+
+# Run kind -> (candidate rows for a cutoff, move a batch of them)
+KINDS = {
+    ArchiveRun.Kind.BOOKINGS: (booking_candidates, move_bookings),
+    ArchiveRun.Kind.MESSAGES: (message_candidates, move_messages),
+}
+
+
+def retention_age(kind):
+    """How old rows of this kind must be before they are archived."""
+    if kind == ArchiveRun.Kind.BOOKINGS:
+        return timedelta(days=settings.ARCHIVE_BOOKINGS_AFTER_DAYS)
+    return timedelta(days=settings.ARCHIVE_MESSAGES_AFTER_DAYS)
+
+
+def start_run(kind, age=None, restart=False):
+    """
+    The unfinished run of this kind, if any, else a new run with its cutoff
+    set `age` (default: the configured retention) before now.
+    """
+    unfinished = ArchiveRun.objects.filter(kind=kind, status=ArchiveRun.Status.RUNNING)
+    if restart:
+        # Rows already moved stay archived; the new run gets a fresh cutoff
+        unfinished.update(status=ArchiveRun.Status.DONE, finished_at=timezone.now())
+    else:
+        run = unfinished.order_by("-started_at").first()
+        if run:
+            return run
+    age = retention_age(kind) if age is None else age
+    return ArchiveRun.objects.create(kind=kind, cutoff=timezone.now() - age)
+
+
+def archive_batch(run, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move the next batch for a run. Returns rows moved (0 when finished)."""
+    candidates, move = KINDS[run.kind]
+    with transaction.atomic():
+        # Locking the checkpoint keeps two workers off the same run
+        locked = ArchiveRun.objects.select_for_update().get(pk=run.pk)
+        rows = list(
+            candidates(locked.cutoff)
+            .select_for_update(of=("self",))
+            .filter(pk__gt=locked.last_pk)
+            .order_by("pk")[:batch_size]
+        )
+        if not rows:
+            return 0
+        move(rows)
+        locked.last_pk = rows[-1].pk
+        locked.moved += len(rows)
+        locked.save(update_fields=["last_pk", "moved", "updated_at"])
+    run.last_pk, run.moved = locked.last_pk, locked.moved
+    return len(rows)
+
+
+def run_archive(kind, age=None, batch_size=ARCHIVE_BATCH_SIZE, restart=False):
+    """Start or resume a run of this kind and process it to the end."""
+    run = start_run(kind, age, restart)
+    while archive_batch(run, batch_size):
+        pass
+    run.status = ArchiveRun.Status.DONE
+    run.finished_at = timezone.now()
+    run.save(update_fields=["status", "finished_at", "updated_at"])
+    return run
@@ -0,0 +1,42 @@
+"""
+Archive-aware reads for history views.
+
+Finished bookings live in Booking until archive_records moves them to
+ArchivedBooking, so history lists page over both tables at once (one
+keyset query each). Archived messages are only in ArchivedMessage.
+"""
+from django.db.models import Q
+from bookings.models import ArchivedBooking, Booking
+from contact.models import ArchivedMessage
+from core.pagination import amerged_keyset_page, merged_keyset_page
+
+HISTORY_KEYS = ("date", "time", "id")
+FINISHED_STATUSES = (Booking.Status.COMPLETED, Booking.Status.CANCELLED)
+
+
+def finished_bookings(user=None):
+    """Completed or cancelled bookings, hot and archived, optionally for one user."""
+    hot = Booking.objects.filter(status__in=FINISHED_STATUSES).select_related("service")
+    archived = ArchivedBooking.objects.all()
+    if user is not None:
+        hot, archived = hot.filter(user=user), archived.filter(user=user)
+    return [hot, archived]
+
+
+def booking_history_page(user=None, cursor=None, size=20):
+    """One page of finished bookings, newest first, across both tables."""
+    return merged_keyset_page(finished_bookings(user), HISTORY_KEYS, cursor, size, descending=True)
+
+
+async def abooking_history_page(user=None, cursor=None, size=20):
+    return await amerged_keyset_page(finished_bookings(user), HISTORY_KEYS, cursor, size, descending=True)
+
+
+def archived_messages(text=None):
+    """Archived messages, optionally matching every word of `text`."""
+    queryset = ArchivedMessage.objects.all()
+    for term in (text or "").split():
+        queryset = queryset.filter(
+            Q(subject__icontains=term) | Q(message__icontains=term) | Q(email__icontains=term)
+        )
+    return queryset
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from archive.archiver import ARCHIVE_BATCH_SIZE, run_archive
+from archive.models import ArchiveRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed/cancelled bookings and read or archived contact "
+        "messages older than the retention age into the archive tables, in "
+        "batches. An interrupted run resumes from its checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only", choices=ArchiveRun.Kind.values, help="Archive one kind of record only.",
+        )
+        parser.add_argument(
+            "--days", type=int, help="Override the retention age (days) for new runs.",
+        )
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Close any unfinished run and start again with a fresh cutoff.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days must not be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        age = timedelta(days=options["days"]) if options["days"] is not None else None
+
+        kinds = [options["only"]] if options["only"] else ArchiveRun.Kind.values
+        for kind in kinds:
+            run = run_archive(kind, age, options["batch_size"], options["restart"])
+            self.stdout.write(
+                f"{run.get_kind_display()}: {run.moved} row(s) archived "
+                f"(before {run.cutoff:%Y-%m-%d %H:%M})"
+            )
+        self.stdout.write(self.style.SUCCESS("Archiving complete."))
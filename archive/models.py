@@ -0,0 +1,36 @@
+from django.db import models
+
+
+class ArchiveRun(models.Model):
+    '''
+    Checkpoint for one pass of `manage.py archive_records` over a table.
+    - cutoff is fixed when the run starts, so a resumed run moves exactly
+      the rows the original run would have.
+    - last_pk is the highest id already moved; each batch advances it in
+      the same transaction as the rows it moves.
+    '''
+    class Kind(models.TextChoices):
+        BOOKINGS = "bookings", "Bookings"
+        MESSAGES = "messages", "Messages"
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.RUNNING)
+    cutoff = models.DateTimeField()
+    last_pk = models.PositiveBigIntegerField(default=0)
+    moved = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Archive {self.get_kind_display().lower()} before {self.cutoff:%Y-%m-%d} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["kind", "status"]),
+        ]
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Booking
+from .events import acting_as
+from .export import export_response
+from .models import ArchivedBooking, Booking, BookingEvent
+from .transitions import transition
 
 
 @admin.register(Booking)
@@ -58,16 +61,47 @@ class BookingAdmin(admin.ModelAdmin):
     )
 
     # Bulk actions
-    actions = ("mark_completed", "cancel_bookings")
+    actions = ("mark_completed", "cancel_bookings", "export_csv", "export_ndjson")
+
+    # Booking events record the staff member making the change
+    def save_model(self, request, obj, form, change):
+        obj.event_actor = request.user
+        super().save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        obj.event_actor = request.user
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with acting_as(request.user):
+            super().delete_queryset(request, queryset)
+
+    # Transitions run in chunks and skip bookings that are not confirmed
+    def run_transition(self, request, queryset, to_status, verb):
+        result = transition(queryset, to_status, actor=request.user)
+        message = f"{result.changed} booking(s) {verb}."
+        if result.skipped:
+            message += f" {result.skipped} skipped (not confirmed)."
+        self.message_user(request, message)
 
     def mark_completed(self, request, queryset):
-        queryset.update(status=Booking.Status.COMPLETED)
+        self.run_transition(request, queryset, Booking.Status.COMPLETED, "marked as completed")
     mark_completed.short_description = "Mark selected bookings as Completed"
 
     def cancel_bookings(self, request, queryset):
-        queryset.update(status=Booking.Status.CANCELLED)
+        self.run_transition(request, queryset, Booking.Status.CANCELLED, "cancelled")
     cancel_bookings.short_description = "Cancel selected bookings"
 
+    # Exports stream the selection, which already carries the changelist
+    # filters when "select all" is used
+    def export_csv(self, request, queryset):
+        return export_response(queryset, "csv", request=request)
+    export_csv.short_description = "Export selected bookings as CSV"
+
+    def export_ndjson(self, request, queryset):
+        return export_response(queryset, "ndjson", request=request)
+    export_ndjson.short_description = "Export selected bookings as NDJSON"
+
     # Permissions
     def has_module_permission(self, request):
         return request.user.is_superuser
@@ -84,3 +118,49 @@ class BookingAdmin(admin.ModelAdmin):
     # But fields are read-only so they can't edit records manually
     def has_change_permission(self, request, obj=None):
         return request.user.is_superuser
+
+
+@admin.register(BookingEvent)
+class BookingEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "booking_id", "kind", "from_status", "to_status", "actor")
+    list_filter = ("kind", "to_status")
+    search_fields = ("booking__id", "actor__email")
+    list_select_related = ("actor",)
+
+    # The log is append-only
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ("date", "time", "user", "service_name_snapshot", "breed_size", "status", "archived_at")
+    list_filter = ("status", "breed_size")
+    search_fields = ("user__email", "service_name_snapshot")
+    date_hierarchy = "date"
+    list_select_related = ("user",)
+
+    # Archived rows are moved here by archive_records and never edited
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,208 @@
+"""
+Maintenance of the per-day slot availability index (SlotAvailability).
+
+The index is always recomputed from Booking rows for the affected dates
+rather than toggled bit by bit, so a missed update heals on the next write
+to that day.
+
+Range reads are cached in the "availability" namespace of core.cache
+(the rows, not the slots, since free slots also depend on the time of
+day); any commit that changes a row bumps the namespace.
+"""
+import time
+from datetime import datetime, timedelta
+from django.db import IntegrityError, OperationalError, transaction
+from django.utils import timezone
+from core.cache import aget_or_compute, bump_version, get_or_compute
+from .models import Booking, SlotAvailability, hour_choices
+
+# Slots must start at least this far from now to be bookable
+MIN_NOTICE = timedelta(hours=1)
+
+# Insert retries for transient lock errors (e.g. SQLite "database is locked")
+INSERT_ATTEMPTS = 3
+INSERT_BACKOFF = 0.05
+
+CACHE_NAMESPACE = "availability"
+CACHE_TTL = 300
+
+
+class SlotTaken(Exception):
+    """Raised when another booking won the race for a slot."""
+
+    def __init__(self, booking, suggestions):
+        super().__init__("This time slot is already booked.")
+        self.booking = booking
+        self.suggestions = suggestions
+
+
+def compute_masks(dates):
+    """Taken-slot bitmask per date, from one query over active bookings."""
+    masks = dict.fromkeys(dates, 0)
+    rows = (
+        Booking.objects
+        .filter(date__in=masks.keys(), status__in=Booking.ACTIVE_STATUSES)
+        .values_list("date", "time")
+    )
+    for date, slot in rows:
+        masks[date] |= 1 << slot.hour
+    return masks
+
+
+def free_choices(date, taken, now=None):
+    """
+    Bookable (time, label) choices for a date given its taken times.
+    Past dates have none; today only offers slots at least MIN_NOTICE away.
+    """
+    now = timezone.localtime(now or timezone.now())
+    if date < now.date():
+        return []
+    choices = [(t, label) for (t, label) in hour_choices(6, 19) if t not in taken]
+    if date == now.date():
+        tz = timezone.get_current_timezone()
+        threshold = now + MIN_NOTICE
+        choices = [
+            (t, label) for (t, label) in choices
+            if timezone.make_aware(datetime.combine(date, t), tz) >= threshold
+        ]
+    return choices
+
+
+def index_rows(start, days):
+    """(date, taken_mask, updated_at) index rows for [start, start + days)."""
+    end = start + timedelta(days=days - 1)
+    return (
+        SlotAvailability.objects
+        .filter(date__range=(start, end))
+        .values_list("date", "taken_mask", "updated_at")
+    )
+
+
+def slots_from_rows(start, days, rows):
+    masks = {}
+    last_modified = None
+    for date, mask, updated_at in rows:
+        masks[date] = mask
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+
+    now = timezone.now()
+    slots = {}
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        taken = SlotAvailability.mask_to_times(masks.get(date, 0))
+        slots[date] = free_choices(date, taken, now)
+    return slots, last_modified
+
+
+def free_slots_in_range(start, days):
+    """
+    Free slots for each day in [start, start + days), read from the index
+    in one range query. Returns (slots_by_date, last_modified).
+    """
+    rows = get_or_compute(
+        CACHE_NAMESPACE, f"{start}:{days}",
+        lambda: list(index_rows(start, days)),
+        ttl=CACHE_TTL,
+    )
+    return slots_from_rows(start, days, rows)
+
+
+async def afree_slots_in_range(start, days):
+    """free_slots_in_range for async views, using the async ORM."""
+    async def read():
+        return [row async for row in index_rows(start, days)]
+
+    rows = await aget_or_compute(CACHE_NAMESPACE, f"{start}:{days}", read, ttl=CACHE_TTL)
+    return slots_from_rows(start, days, rows)
+
+
+def refresh_days(dates):
+    """Recompute the index rows for the given dates."""
+    dates = sorted({d for d in dates if d})
+    if not dates:
+        return
+
+    with transaction.atomic():
+        # Create missing rows, then lock them so concurrent writers to the
+        # same day recompute one after another
+        SlotAvailability.objects.bulk_create(
+            [SlotAvailability(date=d) for d in dates],
+            ignore_conflicts=True,
+        )
+        rows = list(
+            SlotAvailability.objects
+            .select_for_update()
+            .filter(date__in=dates)
+            .order_by("date")
+        )
+
+        masks = compute_masks(dates)
+        now = timezone.now()
+        changed = []
+        for row in rows:
+            if row.taken_mask != masks[row.date]:
+                row.taken_mask = masks[row.date]
+                row.updated_at = now
+                changed.append(row)
+        if changed:
+            SlotAvailability.objects.bulk_update(changed, ["taken_mask", "updated_at"])
+            transaction.on_commit(lambda: bump_version(CACHE_NAMESPACE))
+
+
+def rebuild_all(batch_size=500):
+    """Rebuild the whole index from the bookings table. Returns days touched."""
+    booked_dates = Booking.objects.values_list("date", flat=True).distinct()
+    indexed_dates = SlotAvailability.objects.values_list("date", flat=True)
+    dates = sorted(set(booked_dates) | set(indexed_dates))
+    for i in range(0, len(dates), batch_size):
+        refresh_days(dates[i:i + batch_size])
+    return len(dates)
+
+
+def nearest_free_slots(date, slot, count=3, days=7):
+    """
+    Up to `count` free slots closest to the requested date/time, looking
+    `days` days ahead. Returns a list of (date, time, label).
+    """
+    tz = timezone.get_current_timezone()
+    wanted = timezone.make_aware(datetime.combine(date, slot), tz)
+    slots, _ = free_slots_in_range(max(date, timezone.localdate()), days)
+    candidates = [
+        (d, t, label)
+        for d, choices in slots.items()
+        for (t, label) in choices
+    ]
+    candidates.sort(
+        key=lambda c: abs(timezone.make_aware(datetime.combine(c[0], c[1]), tz) - wanted)
+    )
+    return candidates[:count]
+
+
+def insert_booking(booking, attempts=INSERT_ATTEMPTS):
+    """
+    Insert a validated booking, relying on uniq_active_booking_per_date_time
+    rather than a prior clash check. Each attempt runs in its own savepoint;
+    transient lock errors are retried, a lost race raises SlotTaken with
+    nearby free slots.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                booking.save()
+            return booking
+        except IntegrityError:
+            taken = Booking.objects.filter(
+                date=booking.date,
+                time=booking.time,
+                status__in=Booking.ACTIVE_STATUSES,
+            ).exists()
+            if not taken:
+                raise
+            # The index said the slot was free, so make sure it is current
+            refresh_days({booking.date})
+            raise SlotTaken(booking, nearest_free_slots(booking.date, booking.time))
+        except OperationalError:
+            if attempt == attempts:
+                raise
+            time.sleep(INSERT_BACKOFF * attempt)
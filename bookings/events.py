@@ -0,0 +1,176 @@
+"""
+Recording and reading the BookingEvent log.
+
+Events are written by the booking signal receivers, so they share the
+transaction of the change they describe. Consumers tail the log by id:
+pass the last id seen as `after` and get the next page in id order.
+
+Ids are assigned at insert, not at commit, so a slower transaction can
+commit a lower id after a higher one has been read. A page therefore
+stops at the first gap in the ids while the event after it is younger
+than OUTBOX_COMMIT_LAG; once that much time has passed the gap is taken
+to be a rollback (or a deleted row) and reading moves past it. Every
+event is delivered as long as its transaction commits within
+OUTBOX_COMMIT_LAG of inserting it.
+"""
+import contextvars
+from contextlib import contextmanager
+from datetime import timedelta
+from django.utils import timezone
+from .models import BookingEvent
+
+OUTBOX_PAGE_SIZE = 100
+OUTBOX_MAX_PAGE_SIZE = 1000
+OUTBOX_COMMIT_LAG = timedelta(seconds=30)
+
+# Booking fields copied into created, deleted and transition payloads
+SNAPSHOT_FIELDS = ("date", "time", "service_id", "breed_size", "status", "price_snapshot")
+
+
+def snapshot(booking):
+    return {
+        "user_id": booking.user_id,
+        "service_name": booking.service_name_snapshot,
+        **{name: getattr(booking, name) for name in SNAPSHOT_FIELDS},
+    }
+
+
+_acting_user = contextvars.ContextVar("booking_event_actor", default=None)
+
+
+@contextmanager
+def acting_as(user):
+    """Attribute events recorded in the block to `user`, e.g. for queryset deletes."""
+    token = _acting_user.set(user)
+    try:
+        yield
+    finally:
+        _acting_user.reset(token)
+
+
+def explicit_actor(booking):
+    """booking.event_actor when a view set it, else the user from acting_as()."""
+    return getattr(booking, "event_actor", None) or _acting_user.get()
+
+
+def event_actor_id(booking):
+    """The acting user: set explicitly (see explicit_actor), else the owner."""
+    actor = explicit_actor(booking)
+    return actor.pk if actor else booking.user_id
+
+
+def record_created(booking):
+    BookingEvent.objects.create(
+        booking_id=booking.pk,
+        actor_id=event_actor_id(booking),
+        kind=BookingEvent.Kind.CREATED,
+        to_status=booking.status,
+        payload=snapshot(booking),
+    )
+
+
+def record_updated(booking, stored):
+    """
+    Record an edit; stored holds the tracked values before the save.
+    Saves that changed no tracked field (e.g. only updated_at) record nothing.
+    """
+    changes = {}
+    if stored:
+        changes = {
+            name: [old, getattr(booking, name)]
+            for name, old in stored.items()
+            if getattr(booking, name) != old
+        }
+        if not changes:
+            return
+    from_status = stored["status"] if stored else ""
+    status_changed = from_status and from_status != booking.status
+    BookingEvent.objects.create(
+        booking_id=booking.pk,
+        actor_id=event_actor_id(booking),
+        kind=BookingEvent.Kind.STATUS_CHANGED if status_changed else BookingEvent.Kind.UPDATED,
+        from_status=from_status,
+        to_status=booking.status,
+        payload={"changes": changes},
+    )
+
+
+def record_deleted(booking):
+    actor = explicit_actor(booking)
+    BookingEvent.objects.create(
+        booking_id=booking.pk,
+        actor_id=actor.pk if actor else None,
+        kind=BookingEvent.Kind.DELETED,
+        from_status=booking.status,
+        payload=snapshot(booking),
+    )
+
+
+def state_snapshot(state, status):
+    """snapshot() built from a transition's stored state, after the change."""
+    return {
+        "user_id": state["user_id"],
+        "service_name": state["service_name_snapshot"],
+        "date": state["date"],
+        "time": state["time"],
+        "service_id": state["service_id"],
+        "breed_size": state["breed_size"],
+        "status": status,
+        "price_snapshot": state["price"],
+    }
+
+
+def record_transitions(pks, from_states, to_status, actor=None):
+    """One event per booking moved by a transition chunk, in one insert."""
+    BookingEvent.objects.bulk_create([
+        BookingEvent(
+            booking_id=pk,
+            actor_id=actor.pk if actor else None,
+            kind=BookingEvent.Kind.STATUS_CHANGED,
+            from_status=state["status"],
+            to_status=to_status,
+            payload=state_snapshot(state, to_status),
+        )
+        for pk, state in zip(pks, from_states)
+    ])
+
+
+def serialize(event):
+    return {
+        "id": event.pk,
+        "booking_id": event.booking_id,
+        "actor_id": event.actor_id,
+        "kind": event.kind,
+        "from_status": event.from_status,
+        "to_status": event.to_status,
+        "payload": event.payload,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def settled_count(rows, after, now=None):
+    """
+    How many of `rows` ((id, created_at) pairs after `after`, in id order)
+    can be handed out without skipping an id that may still commit.
+    """
+    settled = (now or timezone.now()) - OUTBOX_COMMIT_LAG
+    expected = after + 1
+    for count, (pk, created_at) in enumerate(rows):
+        if pk != expected and created_at > settled:
+            return count
+        expected = pk + 1
+    return len(rows)
+
+
+def read_outbox(after=0, limit=OUTBOX_PAGE_SIZE):
+    """
+    Committed events with id greater than `after`, oldest first, up to the
+    first gap that may still be filled (see above).
+    Returns (events, cursor) where cursor is the id to pass next time.
+    """
+    limit = max(1, min(limit, OUTBOX_MAX_PAGE_SIZE))
+    rows = list(BookingEvent.objects.filter(pk__gt=after).order_by("pk")[:limit])
+    rows = rows[:settled_count([(event.pk, event.created_at) for event in rows], after)]
+    events = [serialize(event) for event in rows]
+    cursor = events[-1]["id"] if events else after
+    return events, cursor
@@ -0,0 +1,154 @@
+"""
+Streaming export of bookings as CSV or NDJSON.
+
+Rows are read with a chunked iterator and written one line at a time into
+a StreamingHttpResponse, so memory stays flat however many bookings are
+exported. Under ASGI the lines are handed over through an async iterator
+(Django would otherwise read a sync iterator into a list first). CSV
+cells that a spreadsheet would read as a formula are prefixed with an
+apostrophe.
+"""
+import csv
+import json
+from datetime import date
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from .models import Booking
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Lines read per trip to the database thread when streaming under ASGI
+EXPORT_ASYNC_LINES = 500
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# (column, value getter)
+EXPORT_COLUMNS = (
+    ("id", lambda b: b.pk),
+    ("date", lambda b: b.date.isoformat()),
+    ("time", lambda b: b.time.strftime("%H:%M")),
+    ("status", lambda b: b.status),
+    ("breed_size", lambda b: b.breed_size),
+    ("service", lambda b: b.service.name if b.service else b.service_name_snapshot),
+    ("price", lambda b: str(b.price_snapshot) if b.price_snapshot is not None else ""),
+    ("customer_email", lambda b: b.user.email),
+    ("customer_name", lambda b: f"{b.user.first_name} {b.user.last_name}".strip()),
+    ("notes", lambda b: b.notes),
+    ("created_at", lambda b: b.created_at.isoformat()),
+)
+
+# Leading characters that make a spreadsheet treat a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Changelist query parameters accepted by the export, as in BookingAdmin
+FILTER_PARAMS = {
+    "status__exact": "status",
+    "breed_size__exact": "breed_size",
+    "service__id__exact": "service_id",
+    "date__gte": "date__gte",
+    "date__lt": "date__lt",
+    "date__year": "date__year",
+    "date__month": "date__month",
+    "date__day": "date__day",
+}
+SEARCH_FIELDS = ("user__email", "user__first_name", "user__last_name", "service__name")
+
+
+class InvalidExportFilter(ValueError):
+    pass
+
+
+def filter_bookings(params, queryset=None):
+    """
+    Apply BookingAdmin changelist filters (status, breed size, service,
+    date range and search) from a QueryDict or dict.
+    """
+    queryset = Booking.objects.all() if queryset is None else queryset
+    lookups = {}
+    for param, lookup in FILTER_PARAMS.items():
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            if param in ("date__gte", "date__lt"):
+                # DateFieldListFilter may send datetimes; only the date part matters
+                value = date.fromisoformat(value[:10])
+            elif param in ("service__id__exact", "date__year", "date__month", "date__day"):
+                value = int(value)
+        except ValueError:
+            raise InvalidExportFilter(f"Invalid value for {param}.")
+        lookups[lookup] = value
+    queryset = queryset.filter(**lookups)
+
+    search = (params.get("q") or "").strip()
+    for term in search.split():
+        match = Q()
+        for field in SEARCH_FIELDS:
+            match |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(match)
+    return queryset
+
+
+def export_rows(queryset):
+    """Yield each booking as a list of column values, one chunk at a time."""
+    queryset = (
+        queryset
+        .select_related("user", "service")
+        .order_by("date", "time", "id")
+    )
+    for booking in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [getter(booking) for (_column, getter) in EXPORT_COLUMNS]
+
+
+class Echo:
+    """File-like object whose write() hands back the line for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def csv_safe(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for (column, _getter) in EXPORT_COLUMNS])
+    for row in export_rows(queryset):
+        yield writer.writerow([csv_safe(value) for value in row])
+
+
+def ndjson_lines(queryset):
+    columns = [column for (column, _getter) in EXPORT_COLUMNS]
+    for row in export_rows(queryset):
+        yield json.dumps(dict(zip(columns, row))) + "\n"
+
+
+async def async_lines(lines, size=EXPORT_ASYNC_LINES):
+    """Async iterator over a line generator, read `size` lines at a time in a thread."""
+    def take():
+        return list(islice(lines, size))
+
+    try:
+        while chunk := await sync_to_async(take)():
+            for line in chunk:
+                yield line
+    finally:
+        await sync_to_async(lines.close)()
+
+
+def export_response(queryset, fmt="csv", filename="bookings", request=None):
+    """StreamingHttpResponse with the bookings in the given format."""
+    lines = csv_lines(queryset) if fmt == "csv" else ndjson_lines(queryset)
+    if isinstance(request, ASGIRequest):
+        lines = async_lines(lines)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -1,7 +1,7 @@
 from django import forms
 from django.utils import timezone
-from datetime import timedelta
-from .models import Booking, hour_choices
+from .availability import free_choices, insert_booking
+from .models import Booking, SlotAvailability, hour_choices
 from services.models import Service
 
 
@@ -28,38 +28,23 @@ class BookingCreateForm(forms.ModelForm):
             except Exception:
                 selected_date = None
 
-        times = hour_choices(6, 19)
-        if selected_date:
-            # Remove taken (non-cancelled) times for selected date
-            taken = set(
-                Booking.objects
-                .filter(date=selected_date)
-                .exclude(status=Booking.Status.CANCELLED)
-                .values_list("time", flat=True)
-            )
-            times = [(t, label) for (t, label) in times if t not in taken]
+        self.fields["time"].choices = self.time_choices(selected_date)
 
-            # Remove past times
-            now = timezone.localtime(timezone.now())
-            # Threshold = one hour from 'now'
-            threshold = now + timedelta(hours=1)
-
-            # No times in the past
-            if selected_date < today:
-                times = []
-            # Only allow slots an hour or more from 'now'
-            elif selected_date == today:
-                allowed_hour = threshold.hour
-                times = [(t, label) for (t, label) in times if t.hour >= allowed_hour]
-
-        self.fields["time"].choices = times
+    def time_choices(self, selected_date):
+        if not selected_date:
+            return hour_choices(6, 19)
+        # Remove taken (non-cancelled) times and past or too-soon times
+        taken = SlotAvailability.taken_times_for(selected_date)
+        return free_choices(selected_date, taken)
 
     def save(self, user, commit=True):
+        # is_valid() already ran full_clean(); the insert itself is the
+        # final clash check (raises SlotTaken if the slot was just taken)
         obj = super().save(commit=False)
         obj.user = user
+        obj.event_actor = user
         if commit:
-            obj.full_clean()
-            obj.save()
+            insert_booking(obj)
         return obj
 
 
@@ -0,0 +1,31 @@
+import json
+import time as clock
+from django.core.management.base import BaseCommand
+from bookings.events import OUTBOX_PAGE_SIZE, read_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Print booking events after a given id as JSON lines. With --follow, "
+        "keep polling for new events (a recent event may wait up to "
+        "OUTBOX_COMMIT_LAG for an earlier id still being committed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--after", type=int, default=0, help="Last event id already seen.")
+        parser.add_argument("--limit", type=int, default=OUTBOX_PAGE_SIZE, help="Events per read.")
+        parser.add_argument("--follow", action="store_true", help="Keep waiting for new events.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        cursor = options["after"]
+        while True:
+            events, cursor = read_outbox(cursor, options["limit"])
+            for event in events:
+                self.stdout.write(json.dumps(event))
+            if len(events) == options["limit"]:
+                continue
+            if not options["follow"]:
+                break
+            self.stdout.flush()
+            clock.sleep(options["interval"])
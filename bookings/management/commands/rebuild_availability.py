@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from bookings.availability import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day slot availability index from existing bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        days = rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt availability for {days} day(s)."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from bookings.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyBookingStats rollup from existing bookings."
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily stats row(s)."))
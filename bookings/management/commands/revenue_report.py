@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from bookings.models import Booking
+from bookings.reports import GROUPINGS, revenue_by, revenue_total
+
+
+class Command(BaseCommand):
+    help = "Print bookings and revenue for a period, grouped by day, service or breed size."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date (YYYY-MM-DD), default 30 days ago.")
+        parser.add_argument("--end", help="Last date (YYYY-MM-DD), default today.")
+        parser.add_argument("--by", choices=sorted(GROUPINGS), default="day")
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=Booking.Status.values,
+            help="Statuses to include (repeatable), default completed.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end = date.fromisoformat(options["end"]) if options["end"] else timezone.localdate()
+            start = date.fromisoformat(options["start"]) if options["start"] else end - timedelta(days=29)
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}")
+        statuses = options["status"] or [Booking.Status.COMPLETED]
+
+        for row in revenue_by(options["by"], start, end, statuses):
+            self.stdout.write(f"{row[options['by']]}\t{row['bookings']}\t£{row['revenue']}")
+        total = revenue_total(start, end, statuses)
+        self.stdout.write(f"Total {start} - {end}\t{total['bookings']}\t£{total['revenue']}")
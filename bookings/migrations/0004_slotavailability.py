@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+def backfill_availability(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    SlotAvailability = apps.get_model("bookings", "SlotAvailability")
+
+    masks = {}
+    rows = (
+        Booking.objects
+        .filter(status__in=["confirmed", "completed"])
+        .values_list("date", "time")
+    )
+    for date, slot in rows.iterator():
+        masks[date] = masks.get(date, 0) | (1 << slot.hour)
+
+    SlotAvailability.objects.bulk_create(
+        [SlotAvailability(date=d, taken_mask=m) for d, m in masks.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_service_name_snapshot_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotAvailability',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('taken_mask', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Slot availability',
+                'verbose_name_plural': 'Slot availability',
+            },
+        ),
+        migrations.RunPython(backfill_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:40
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_schedule(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    tz = timezone.get_default_timezone()
+
+    batch = []
+    for booking in Booking.objects.only("pk", "date", "time").iterator(chunk_size=500):
+        booking.starts_at = timezone.make_aware(datetime.combine(booking.date, booking.time), tz)
+        booking.ends_at = booking.starts_at + timedelta(hours=1)
+        batch.append(booking)
+        if len(batch) >= 500:
+            Booking.objects.bulk_update(batch, ["starts_at", "ends_at"])
+            batch = []
+    if batch:
+        Booking.objects.bulk_update(batch, ["starts_at", "ends_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_slotavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_schedule, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'starts_at'], name='bookings_bo_status_3128b5_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:11
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_stats(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    DailyBookingStats = apps.get_model("bookings", "DailyBookingStats")
+
+    buckets = {}
+    rows = Booking.objects.select_related("service").only(
+        "date", "breed_size", "status", "service__price_small",
+        "service__price_medium", "service__price_large",
+    )
+    for b in rows.iterator(chunk_size=500):
+        key = (b.date, b.service_id or 0, b.breed_size)
+        stats = buckets.setdefault(key, DailyBookingStats(
+            date=key[0], service_id=key[1], breed_size=key[2], revenue=Decimal("0"),
+        ))
+        setattr(stats, b.status, getattr(stats, b.status) + 1)
+        if b.status == "completed" and b.service_id:
+            stats.revenue += getattr(b.service, f"price_{b.breed_size}")
+
+    DailyBookingStats.objects.bulk_create(buckets.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_starts_at_ends_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service_id', models.PositiveBigIntegerField(default=0)),
+                ('breed_size', models.CharField(choices=[('small', 'Small'), ('medium', 'Medium'), ('large', 'Large')], max_length=10)),
+                ('confirmed', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name': 'Daily booking stats',
+                'verbose_name_plural': 'Daily booking stats',
+                'indexes': [models.Index(fields=['service_id', 'date'], name='bookings_da_service_0045e7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'service_id', 'breed_size'), name='uniq_daily_booking_stats_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_price_snapshot(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    Service = apps.get_model("services", "Service")
+
+    # One UPDATE per breed size, pricing from the current service
+    for size in ("small", "medium", "large"):
+        price = Service.objects.filter(pk=OuterRef("service_id")).values(f"price_{size}")[:1]
+        Booking.objects.filter(
+            price_snapshot__isnull=True,
+            service__isnull=False,
+            breed_size=size,
+        ).update(price_snapshot=Subquery(price))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_dailybookingstats'),
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='price_snapshot',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.RunPython(backfill_price_snapshot, migrations.RunPython.noop),
+    ]
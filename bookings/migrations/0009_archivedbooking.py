@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:34
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_bookingevent'),
+        ('services', '0002_service_includes_items'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('service_name_snapshot', models.CharField(blank=True, default='', max_length=120)),
+                ('price_snapshot', models.DecimalField(blank=True, decimal_places=2, max_digits=7, null=True)),
+                ('date', models.DateField()),
+                ('time', models.TimeField(choices=[(datetime.time(6, 0), '06:00'), (datetime.time(7, 0), '07:00'), (datetime.time(8, 0), '08:00'), (datetime.time(9, 0), '09:00'), (datetime.time(10, 0), '10:00'), (datetime.time(11, 0), '11:00'), (datetime.time(12, 0), '12:00'), (datetime.time(13, 0), '13:00'), (datetime.time(14, 0), '14:00'), (datetime.time(15, 0), '15:00'), (datetime.time(16, 0), '16:00'), (datetime.time(17, 0), '17:00'), (datetime.time(18, 0), '18:00'), (datetime.time(19, 0), '19:00')])),
+                ('breed_size', models.CharField(choices=[('small', 'Small'), ('medium', 'Medium'), ('large', 'Large')], max_length=10)),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=10)),
+                ('starts_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_bookings', to='services.service')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('date', 'time'),
+                'indexes': [models.Index(fields=['user', 'date', 'time'], name='bookings_ar_user_id_1bdee6_idx'), models.Index(fields=['date', 'time'], name='bookings_ar_date_d3f4e4_idx'), models.Index(fields=['status', 'starts_at'], name='bookings_ar_status_0920e3_idx')],
+            },
+        ),
+    ]
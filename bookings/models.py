@@ -1,12 +1,17 @@
 from datetime import time, datetime, timedelta
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.db.models import Q
 from django.utils import timezone
 from services.models import Service
 
 
+# Every booking slot lasts one hour
+SLOT_LENGTH = timedelta(hours=1)
+
+
 def hour_choices(start=6, end=19):
     '''
     Generate hourly time choices between start and end hours (inclusive).
@@ -15,6 +20,26 @@ def hour_choices(start=6, end=19):
     return [(time(h, 0), f"{h:02d}:00") for h in range(start, end + 1)]
 
 
+class BookingQuerySet(models.QuerySet):
+    """Time-window filters on the stored starts_at, served by its index."""
+
+    def upcoming(self, now=None):
+        # Not yet finished: ends_at > now, i.e. starts_at > now - SLOT_LENGTH
+        now = now or timezone.now()
+        return self.filter(starts_at__gt=now - SLOT_LENGTH)
+
+    def past(self, now=None):
+        now = now or timezone.now()
+        return self.filter(starts_at__lte=now - SLOT_LENGTH)
+
+    def on_day(self, day=None):
+        day = day or timezone.localdate()
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(day, time.min), tz)
+        end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+        return self.filter(starts_at__gte=start, starts_at__lt=end)
+
+
 class Booking(models.Model):
     '''
     Model representing a booking.
@@ -32,6 +57,9 @@ class Booking(models.Model):
         CANCELLED = "cancelled", "Cancelled"
         COMPLETED = "completed", "Completed"
 
+    # Statuses that hold a slot (mirrors uniq_active_booking_per_date_time)
+    ACTIVE_STATUSES = (Status.CONFIRMED, Status.COMPLETED)
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -56,6 +84,11 @@ class Booking(models.Model):
         max_length=120, editable=False, blank=True, default=""
     )
 
+    # Price for the booked service and breed size at booking time
+    price_snapshot = models.DecimalField(
+        max_digits=7, decimal_places=2, editable=False, null=True, blank=True
+    )
+
     date = models.DateField()
     time = models.TimeField(choices=hour_choices(6, 19))  # 06:00-19:00 starts
     breed_size = models.CharField(
@@ -68,9 +101,23 @@ class Booking(models.Model):
         choices=Status.choices,
         default=Status.CONFIRMED,
     )
+    # Aware start/end of the slot, derived from date and time on save
+    starts_at = models.DateTimeField(editable=False, blank=True)
+    ends_at = models.DateTimeField(editable=False, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so edits and signals can tell what changed
+        tracked = ("service_id", "date", "time", "status", "breed_size", "price_snapshot")
+        if all(name in instance.__dict__ for name in tracked):
+            instance._loaded_values = {name: instance.__dict__[name] for name in tracked}
+        return instance
+
     def get_service_display_name(self) -> str:
         """Safe service name for admin when FK may be null after deletion."""
         if self.service_id and self.service:
@@ -78,29 +125,53 @@ class Booking(models.Model):
         return self.service_name_snapshot or "Service (deleted)"
 
     def clean(self):
+        context = BookingValidationContext.load([self])
+        errors = self.collect_errors(context)
+        if errors:
+            raise ValidationError(errors)
+
+    @classmethod
+    def validate_many(cls, bookings):
+        """
+        Validate candidate bookings together with set-based queries.
+        Returns {index: ValidationError} for the invalid ones. Candidates are
+        checked in order, so a later one cannot take a slot claimed earlier.
+        """
+        bookings = list(bookings)
+        context = BookingValidationContext.load(bookings)
+        claimed = set()
+        invalid = {}
+        for index, booking in enumerate(bookings):
+            errors = booking.collect_errors(context, claimed)
+            if errors:
+                invalid[index] = ValidationError(errors)
+            elif booking.date and booking.time:
+                claimed.add((booking.date, booking.time))
+        return invalid
+
+    def collect_errors(self, context, claimed=()):
         errors = {}
+        prior = context.prior_for(self)
+        is_new = prior is None
 
         # Only active services can be selected
         # Except reverting to their original service even if it's now inactive
         if self.service_id:
+            service_active = context.service_active.get(self.service_id, False)
             if not self.pk:
                 # Creating a new booking (must be active)
-                if not self.service.is_active:
+                if not service_active:
                     errors["service"] = (
                         "This service is not active and cannot be booked. "
                         "Please choose a different service."
                     )
             else:
                 # Editing an existing booking
-                try:
-                    current_service_id = Booking.objects.only("service_id").get(pk=self.pk).service_id
-                except Booking.DoesNotExist:
-                    current_service_id = None
-
+                current_service_id = prior["service_id"] if prior else None
                 if self.service_id != current_service_id:
                     # Allow reverting to original_service (even if inactive)
                     original_allowed_id = self.original_service_id
-                    if not self.service.is_active and self.service_id != original_allowed_id:
+                    if not service_active and self.service_id != original_allowed_id:
                         errors["service"] = (
                             "This service is not active and cannot be selected. "
                             "Please choose a different service."
@@ -115,16 +186,18 @@ class Booking(models.Model):
             )
 
         # Prevent double-booking for non-cancelled bookings
+        # The slot held by this booking's stored row is not a clash
         if self.date and self.time:
-            clash_qs = Booking.objects.filter(
-                date=self.date,
-                time=self.time,
-            ).exclude(status=Booking.Status.CANCELLED)
-
-            if self.pk:
-                clash_qs = clash_qs.exclude(pk=self.pk)
+            holds_stored_slot = (
+                prior is not None
+                and prior["date"] == self.date
+                and prior["time"] == self.time
+                and prior["status"] in self.ACTIVE_STATUSES
+            )
+            taken = SlotAvailability.mask_to_times(context.taken.get(self.date, 0))
+            clash = (self.time in taken and not holds_stored_slot) or (self.date, self.time) in claimed
 
-            if clash_qs.exists():
+            if clash:
                 errors["time"] = (
                     "This time slot is already booked. "
                     "Please choose a different time."
@@ -132,54 +205,72 @@ class Booking(models.Model):
 
         # Block booking of past or too-soon slots
         if self.date and self.time and "time" not in errors:
-            is_new = not bool(self.pk)
-            date_time_changed = False
-            if not is_new:
-                try:
-                    original = Booking.objects.only("date", "time").get(pk=self.pk)
-                    date_time_changed = (self.date != original.date) or (self.time != original.time)
-                except Booking.DoesNotExist:
-                    is_new = True
+            date_time_changed = (
+                not is_new
+                and (self.date != prior["date"] or self.time != prior["time"])
+            )
 
             if is_new or date_time_changed:
                 now = timezone.localtime(timezone.now())
                 threshold = now + timedelta(hours=1)
 
                 # Compare aware datetimes
-                if self.starts_at < threshold:
+                if self.compute_schedule()[0] < threshold:
                     errors["time"] = (
                         "This time has passed or is no longer available. "
                         "Please choose a later slot."
                     )
 
-        if errors:
-            raise ValidationError(errors)
+        return errors
 
     def save(self, *args, **kwargs):
         # Capture original_service on first save
         if not self.pk and self.service_id and not self.original_service_id:
             self.original_service_id = self.service_id
 
+        # Keep the stored start/end in step with date and time
+        self.sync_schedule()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"date", "time"}.intersection(update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"starts_at", "ends_at"}
+
         # Ensure service name snapshot is set
         if not self.service_name_snapshot and self.service_id:
             # Record name at time of booking
             self.service_name_snapshot = self.service.name
 
-        super().save(*args, **kwargs)
+        # Record the price when booked, or when the service/size is changed
+        loaded = getattr(self, "_loaded_values", None)
+        booked_item_changed = loaded is not None and (
+            loaded["service_id"] != self.service_id
+            or loaded["breed_size"] != self.breed_size
+        )
+        if self.service_id and (self.price_snapshot is None or booked_item_changed):
+            self.price_snapshot = self.service.price_for(self.breed_size)
 
-    @property
-    def starts_at(self):
+        # The row, its event and the index/stats updates commit together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def compute_schedule(self):
+        """Aware (starts_at, ends_at) for the booking's date and time."""
+        if not (self.date and self.time):
+            return None, None
         tz = timezone.get_current_timezone()
-        naive = datetime.combine(self.date, self.time)
-        return timezone.make_aware(naive, tz)
+        starts_at = timezone.make_aware(datetime.combine(self.date, self.time), tz)
+        return starts_at, starts_at + SLOT_LENGTH
 
-    @property
-    def ends_at(self):
-        return self.starts_at + timedelta(hours=1)
+    def sync_schedule(self):
+        self.starts_at, self.ends_at = self.compute_schedule()
+
+    def clean_fields(self, exclude=None):
+        self.sync_schedule()
+        super().clean_fields(exclude=exclude)
 
     @property
     def is_past(self):
-        return timezone.localtime(timezone.now()) >= self.ends_at
+        ends_at = self.ends_at or self.compute_schedule()[1]
+        return timezone.now() >= ends_at
 
     def __str__(self):
         return (
@@ -203,4 +294,258 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=["date", "time"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["status", "starts_at"]),
+        ]
+
+
+class BookingValidationContext:
+    '''
+    Database state needed to validate bookings, loaded up front.
+    - priors: stored service/date/time/status per booking pk
+    - service_active: is_active per selected service id
+    - taken: taken-slot bitmask per date, from SlotAvailability
+    Values already on the instances (rows loaded from the database, services
+    cached by a form) are reused, so a form edit needs one or two queries and
+    N candidates need at most three.
+    '''
+    def __init__(self, priors, service_active, taken):
+        self.priors = priors
+        self.service_active = service_active
+        self.taken = taken
+
+    @classmethod
+    def load(cls, bookings):
+        priors = {}
+        missing_priors = set()
+        service_active = {}
+        missing_services = set()
+        dates = set()
+
+        for booking in bookings:
+            if booking.pk:
+                loaded = getattr(booking, "_loaded_values", None)
+                if loaded:
+                    priors[booking.pk] = loaded
+                else:
+                    missing_priors.add(booking.pk)
+            if booking.service_id:
+                if Booking.service.is_cached(booking) and booking.service is not None:
+                    service_active[booking.service_id] = booking.service.is_active
+                else:
+                    missing_services.add(booking.service_id)
+            if booking.date:
+                dates.add(booking.date)
+
+        if missing_priors:
+            rows = (
+                Booking.objects
+                .filter(pk__in=missing_priors)
+                .order_by()
+                .values("pk", "service_id", "date", "time", "status")
+            )
+            for row in rows:
+                priors[row.pop("pk")] = row
+
+        missing_services -= service_active.keys()
+        if missing_services:
+            service_active.update(
+                Service.objects
+                .filter(pk__in=missing_services)
+                .order_by()
+                .values_list("pk", "is_active")
+            )
+
+        taken = {}
+        if dates:
+            taken = dict(
+                SlotAvailability.objects
+                .filter(date__in=dates)
+                .values_list("date", "taken_mask")
+            )
+
+        return cls(priors, service_active, taken)
+
+    def prior_for(self, booking):
+        """Stored values for the booking, or None when it is not saved yet."""
+        if not booking.pk:
+            return None
+        return self.priors.get(booking.pk)
+
+
+class SlotAvailability(models.Model):
+    '''
+    Per-day index of taken booking slots.
+    - One row per date; bit N of taken_mask is set when the N:00 slot is
+      held by a confirmed or completed booking.
+    - Maintained by bookings.availability, never edited by hand.
+    '''
+    date = models.DateField(primary_key=True)
+    taken_mask = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def mask_to_times(mask):
+        return {time(h, 0) for h in range(24) if mask >> h & 1}
+
+    @classmethod
+    def taken_times_for(cls, date):
+        """Taken start times for a date (a single primary-key lookup)."""
+        mask = cls.objects.filter(pk=date).values_list("taken_mask", flat=True).first()
+        return cls.mask_to_times(mask or 0)
+
+    def taken_times(self):
+        return self.mask_to_times(self.taken_mask)
+
+    def __str__(self):
+        return f"{self.date} ({bin(self.taken_mask).count('1')} taken)"
+
+    class Meta:
+        verbose_name = "Slot availability"
+        verbose_name_plural = "Slot availability"
+
+
+class DailyBookingStats(models.Model):
+    '''
+    Rollup of bookings per date, service and breed size.
+    - Counts per status and the value of completed bookings.
+    - Updated incrementally by bookings.stats on every state change;
+      rebuild with `manage.py rebuild_booking_stats`.
+    - service_id is the booked service's pk (0 when there is none), not a
+      foreign key, so history survives service deletion.
+    '''
+    date = models.DateField()
+    service_id = models.PositiveBigIntegerField(default=0)
+    breed_size = models.CharField(max_length=10, choices=Booking.BreedSize.choices)
+    confirmed = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.date} | service {self.service_id} | {self.breed_size}"
+
+    class Meta:
+        verbose_name = "Daily booking stats"
+        verbose_name_plural = "Daily booking stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("date", "service_id", "breed_size"),
+                name="uniq_daily_booking_stats_bucket",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["service_id", "date"]),
+        ]
+
+
+class BookingEvent(models.Model):
+    '''
+    Append-only log of booking changes, also read as an outbox by
+    downstream consumers (tail by increasing id).
+    - Written in the same transaction as the change it records.
+    - booking is kept without a database constraint so events outlive
+      deleted bookings.
+    - actor is the user who made the change, when known.
+    '''
+    class Kind(models.TextChoices):
+        CREATED = "created", "Created"
+        UPDATED = "updated", "Updated"
+        STATUS_CHANGED = "status_changed", "Status changed"
+        DELETED = "deleted", "Deleted"
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="events",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="booking_events",
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    from_status = models.CharField(max_length=10, blank=True, default="")
+    to_status = models.CharField(max_length=10, blank=True, default="")
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Booking events are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} booking {self.booking_id}"
+
+    class Meta:
+        ordering = ["id"]
+
+
+class ArchivedBooking(models.Model):
+    '''
+    Compact copy of an old completed or cancelled booking.
+    - Moved out of Booking by `manage.py archive_records`, keeping its id,
+      so events and exports still line up.
+    - Holds only what history, reports and the stats rebuild read; notes,
+      the original service and update times are dropped.
+    - Still counted in DailyBookingStats; it was counted while live.
+    '''
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_bookings",
+        db_index=False,  # covered by the (user, date, time) index
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="archived_bookings",
+    )
+    service_name_snapshot = models.CharField(max_length=120, blank=True, default="")
+    price_snapshot = models.DecimalField(max_digits=7, decimal_places=2, null=True, blank=True)
+    date = models.DateField()
+    time = models.TimeField(choices=hour_choices(6, 19))
+    breed_size = models.CharField(max_length=10, choices=Booking.BreedSize.choices)
+    status = models.CharField(max_length=10, choices=Booking.Status.choices)
+    starts_at = models.DateTimeField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_booking(cls, booking):
+        return cls(
+            id=booking.pk,
+            user_id=booking.user_id,
+            service_id=booking.service_id,
+            service_name_snapshot=booking.get_service_display_name(),
+            price_snapshot=booking.price_snapshot,
+            date=booking.date,
+            time=booking.time,
+            breed_size=booking.breed_size,
+            status=booking.status,
+            starts_at=booking.starts_at,
+            created_at=booking.created_at,
+        )
+
+    def get_service_display_name(self) -> str:
+        return self.service_name_snapshot or "Service (deleted)"
+
+    def __str__(self):
+        return (
+            f"{self.get_service_display_name()} | "
+            f"{self.date} @ {self.time.strftime('%H:%M')} "
+            f"[{self.get_status_display()}]"
+        )
+
+    class Meta:
+        ordering = ("date", "time")
+        indexes = [
+            models.Index(fields=["user", "date", "time"]),
+            models.Index(fields=["date", "time"]),
+            models.Index(fields=["status", "starts_at"]),
         ]
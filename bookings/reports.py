@@ -0,0 +1,72 @@
+"""
+Revenue reporting over the bookings and archived bookings tables.
+
+Figures come from price_snapshot, so no join to Service is needed and
+results stay correct after price edits, service deletion or archiving.
+Periods are filtered on starts_at, which each table's (status, starts_at)
+index serves.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .models import ArchivedBooking, Booking
+
+# By default only completed bookings count as revenue
+REVENUE_STATUSES = (Booking.Status.COMPLETED,)
+
+GROUPINGS = {
+    "day": "date",
+    "service": "service_name_snapshot",
+    "breed_size": "breed_size",
+}
+
+
+def period_bookings(start, end, statuses=REVENUE_STATUSES, model=Booking):
+    """
+    Bookings with the given statuses on local dates [start, end], from
+    Booking or ArchivedBooking.
+    """
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start, time.min), tz)
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    return model.objects.filter(
+        status__in=statuses,
+        starts_at__gte=lower,
+        starts_at__lt=upper,
+    )
+
+
+def revenue_total(start, end, statuses=REVENUE_STATUSES):
+    totals = {"bookings": 0, "revenue": Decimal("0")}
+    for model in (Booking, ArchivedBooking):
+        row = period_bookings(start, end, statuses, model).aggregate(
+            bookings=Count("id"),
+            revenue=Sum("price_snapshot"),
+        )
+        totals["bookings"] += row["bookings"]
+        totals["revenue"] += row["revenue"] or Decimal("0")
+    return totals
+
+
+def revenue_by(grouping, start, end, statuses=REVENUE_STATUSES):
+    """
+    Bookings and revenue per day, service or breed size.
+    Returns a list of dicts with the group key, "bookings" and "revenue".
+    """
+    field = GROUPINGS[grouping]
+    groups = {}
+    for model in (Booking, ArchivedBooking):
+        rows = (
+            period_bookings(start, end, statuses, model)
+            .order_by()
+            .values(field)
+            .annotate(bookings=Count("id"), revenue=Sum("price_snapshot"))
+        )
+        for row in rows:
+            group = groups.setdefault(
+                row[field], {grouping: row[field], "bookings": 0, "revenue": Decimal("0")},
+            )
+            group["bookings"] += row["bookings"]
+            group["revenue"] += row["revenue"] or Decimal("0")
+    return [groups[key] for key in sorted(groups)]
@@ -0,0 +1,67 @@
+"""
+Search for the next free booking slots.
+
+Free slots are found by merging the hourly slot grid with the per-day
+availability index, read in one range query per window of days rather
+than one query per day.
+"""
+from datetime import datetime, timedelta
+from django.utils import timezone
+from .availability import MIN_NOTICE
+from .models import SlotAvailability, hour_choices
+
+# Days read from the index per query, and how far ahead to look at most
+SEARCH_WINDOW_DAYS = 60
+SEARCH_HORIZON_DAYS = 366
+
+
+def next_free_slots(after=None, count=5, weekdays=None, hours=None,
+                    horizon_days=SEARCH_HORIZON_DAYS):
+    """
+    The next `count` free slots starting after the aware datetime `after`
+    (default: now plus the minimum notice).
+    - weekdays: optional iterable of ints, Monday=0 ... Sunday=6
+    - hours: optional (first, last) start hours, inclusive
+    Returns a list of aware datetimes in chronological order.
+    """
+    tz = timezone.get_current_timezone()
+    earliest = timezone.now() + MIN_NOTICE
+    after = max(after, earliest) if after else earliest
+    after = timezone.localtime(after, tz)
+
+    grid = [t for (t, _label) in hour_choices(6, 19)]
+    if hours:
+        first, last = hours
+        grid = [t for t in grid if first <= t.hour <= last]
+    weekdays = set(weekdays) if weekdays is not None else None
+    if not grid or weekdays == set():
+        return []
+
+    results = []
+    window_start = after.date()
+    last_day = window_start + timedelta(days=horizon_days)
+    while window_start <= last_day and len(results) < count:
+        window_end = min(window_start + timedelta(days=SEARCH_WINDOW_DAYS - 1), last_day)
+        masks = dict(
+            SlotAvailability.objects
+            .filter(date__range=(window_start, window_end), taken_mask__gt=0)
+            .values_list("date", "taken_mask")
+        )
+
+        day = window_start
+        while day <= window_end and len(results) < count:
+            if weekdays is None or day.weekday() in weekdays:
+                mask = masks.get(day, 0)
+                for slot in grid:
+                    if mask >> slot.hour & 1:
+                        continue
+                    starts_at = timezone.make_aware(datetime.combine(day, slot), tz)
+                    if starts_at < after:
+                        continue
+                    results.append(starts_at)
+                    if len(results) == count:
+                        break
+            day += timedelta(days=1)
+        window_start = window_end + timedelta(days=1)
+
+    return results
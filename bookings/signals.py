@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from services.models import Service
+from . import events, stats
+from .availability import refresh_days
+from .models import ArchivedBooking, Booking
+
+# Fields that can change which slot a booking holds
+SLOT_FIELDS = {"date", "time", "status"}
+TRACKED_FIELDS = ("service_id", "date", "time", "status", "breed_size", "price_snapshot")
+
+# Sent once per chunk by bookings.transitions, inside the chunk's transaction,
+# with pks, from_states (each booking's fields before the change, price as
+# "price"), to_status and actor
+bookings_transitioned = Signal()
+
+
+@receiver(pre_save, sender=Booking)
+def booking_pre_save(sender, instance, raw=False, **kwargs):
+    # Instances not loaded through the ORM (e.g. built with a pk) still need
+    # their stored values to work out what changed
+    if raw or instance._state.adding or hasattr(instance, "_loaded_values"):
+        return
+    row = Booking.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    if row:
+        instance._loaded_values = row
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+
+    loaded = getattr(instance, "_loaded_values", None)
+    if update_fields is None or SLOT_FIELDS.intersection(update_fields):
+        dates = {instance.date}
+        if loaded:
+            dates.add(loaded["date"])
+        refresh_days(dates)
+
+    delta = stats.StatsDelta()
+    delta.move(None if created else stats.stored_state(instance), stats.booking_state(instance))
+    delta.apply()
+
+    if created:
+        events.record_created(instance)
+    else:
+        events.record_updated(instance, loaded)
+
+    # The saved values become the stored values for later edits
+    instance._loaded_values = {name: getattr(instance, name) for name in TRACKED_FIELDS}
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    refresh_days({instance.date})
+
+    delta = stats.StatsDelta()
+    delta.add(stats.stored_state(instance) or stats.booking_state(instance), -1)
+    delta.apply()
+
+    events.record_deleted(instance)
+
+
+@receiver(post_delete, sender=ArchivedBooking)
+def archived_booking_deleted(sender, instance, **kwargs):
+    # Archived bookings stay in the rollup until they are deleted (e.g. with
+    # their user)
+    delta = stats.StatsDelta()
+    delta.add(stats.booking_state(instance), -1)
+    delta.apply()
+
+
+@receiver(bookings_transitioned)
+def bookings_transitioned_events(sender, pks, from_states, to_status, actor=None, **kwargs):
+    events.record_transitions(pks, from_states, to_status, actor)
+
+
+@receiver(post_delete, sender=Service)
+def service_deleted(sender, instance, **kwargs):
+    stats.fold_service(instance.pk)
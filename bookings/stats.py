@@ -0,0 +1,232 @@
+"""
+Incremental maintenance of the DailyBookingStats rollup.
+
+Every booking change is expressed as +/- deltas on (date, service_id,
+breed_size) buckets and applied with F() increments, so concurrent writers
+never lose updates and nothing re-aggregates the bookings table.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from services.models import Service
+from .models import ArchivedBooking, Booking, DailyBookingStats
+
+STATUS_FIELDS = {
+    Booking.Status.CONFIRMED: "confirmed",
+    Booking.Status.COMPLETED: "completed",
+    Booking.Status.CANCELLED: "cancelled",
+}
+
+
+class StatsDelta:
+    """Accumulates bucket changes and applies them in one transaction."""
+
+    def __init__(self):
+        self.buckets = defaultdict(lambda: defaultdict(int))
+
+    def add(self, state, sign=1):
+        """state: dict with date, service_id, breed_size, status and price."""
+        key = (state["date"], state["service_id"] or 0, state["breed_size"])
+        bucket = self.buckets[key]
+        bucket[STATUS_FIELDS[state["status"]]] += sign
+        if state["status"] == Booking.Status.COMPLETED:
+            bucket["revenue"] += sign * (state["price"] or Decimal("0"))
+
+    def move(self, old, new):
+        if old == new:
+            return
+        if old:
+            self.add(old, -1)
+        if new:
+            self.add(new, 1)
+
+    def apply(self):
+        changes = {
+            key: {f: v for f, v in bucket.items() if v}
+            for key, bucket in self.buckets.items()
+        }
+        changes = {key: fields for key, fields in changes.items() if fields}
+        if not changes:
+            return
+
+        with transaction.atomic():
+            DailyBookingStats.objects.bulk_create(
+                [
+                    DailyBookingStats(date=d, service_id=sid, breed_size=size)
+                    for (d, sid, size) in changes
+                ],
+                ignore_conflicts=True,
+            )
+            for (d, sid, size), fields in sorted(changes.items()):
+                DailyBookingStats.objects.filter(
+                    date=d, service_id=sid, breed_size=size,
+                ).update(**{f: F(f) + v for f, v in fields.items()})
+        self.buckets.clear()
+
+
+def booking_state(booking):
+    """Current stats-relevant state of a booking instance."""
+    return {
+        "date": booking.date,
+        "service_id": booking.service_id,
+        "breed_size": booking.breed_size,
+        "status": booking.status,
+        "price": booking.price_snapshot,
+    }
+
+
+def stored_state(booking):
+    """State as last loaded from or saved to the database, if known."""
+    loaded = getattr(booking, "_loaded_values", None)
+    if not loaded:
+        return None
+    return {
+        "date": loaded["date"],
+        "service_id": loaded["service_id"],
+        "breed_size": loaded["breed_size"],
+        "status": loaded["status"],
+        "price": loaded["price_snapshot"],
+    }
+
+
+def states_for_queryset(queryset):
+    """Stats-relevant state of every booking in a queryset (one query)."""
+    states = []
+    for row in queryset.values("date", "service_id", "breed_size", "status", "price_snapshot"):
+        row["price"] = row.pop("price_snapshot")
+        states.append(row)
+    return states
+
+
+def record_status_change(states, new_status):
+    """Apply a bulk status update for bookings in the given states."""
+    delta = StatsDelta()
+    for state in states:
+        delta.move(state, dict(state, status=new_status))
+    delta.apply()
+
+
+def fold_service(service_id):
+    """Move a deleted service's buckets into the no-service bucket (0)."""
+    delta = StatsDelta()
+    with transaction.atomic():
+        rows = DailyBookingStats.objects.select_for_update().filter(service_id=service_id)
+        for row in rows:
+            bucket = delta.buckets[(row.date, 0, row.breed_size)]
+            for field in ("confirmed", "completed", "cancelled", "revenue"):
+                bucket[field] += getattr(row, field)
+        rows.delete()
+        delta.apply()
+
+
+def rebuild():
+    """
+    Recompute the whole rollup from the bookings and archived bookings
+    tables. Returns rows written.
+    """
+    revenue = Sum("price_snapshot", filter=Q(status=Booking.Status.COMPLETED))
+    buckets = {}
+    for model in (Booking, ArchivedBooking):
+        rows = (
+            model.objects
+            .order_by()
+            .values("date", "service_id", "breed_size")
+            .annotate(
+                confirmed=Count("id", filter=Q(status=Booking.Status.CONFIRMED)),
+                completed=Count("id", filter=Q(status=Booking.Status.COMPLETED)),
+                cancelled=Count("id", filter=Q(status=Booking.Status.CANCELLED)),
+                revenue=revenue,
+            )
+        )
+        for row in rows.iterator():
+            key = (row["date"], row["service_id"] or 0, row["breed_size"])
+            stats = buckets.setdefault(key, DailyBookingStats(
+                date=key[0], service_id=key[1], breed_size=key[2],
+            ))
+            stats.confirmed += row["confirmed"]
+            stats.completed += row["completed"]
+            stats.cancelled += row["cancelled"]
+            stats.revenue += row["revenue"] or Decimal("0")
+
+    with transaction.atomic():
+        DailyBookingStats.objects.all().delete()
+        DailyBookingStats.objects.bulk_create(buckets.values(), batch_size=500)
+    return len(buckets)
+
+
+def confirmed_counts_query(service_ids):
+    return (
+        DailyBookingStats.objects
+        .filter(service_id__in=service_ids)
+        .order_by()
+        .values("service_id")
+        .annotate(total=Sum("confirmed"))
+    )
+
+
+def confirmed_counts(service_ids):
+    """Confirmed bookings per service id, summed from the rollup."""
+    return {r["service_id"]: r["total"] for r in confirmed_counts_query(service_ids)}
+
+
+async def aconfirmed_counts(service_ids):
+    return {r["service_id"]: r["total"] async for r in confirmed_counts_query(service_ids)}
+
+
+def summary_query(start, end):
+    return (
+        DailyBookingStats.objects
+        .filter(date__range=(start, end))
+        .order_by()
+        .values("service_id")
+        .annotate(
+            confirmed=Sum("confirmed"),
+            completed=Sum("completed"),
+            cancelled=Sum("cancelled"),
+            revenue=Sum("revenue"),
+        )
+    )
+
+
+def service_names_query(service_ids):
+    return Service.objects.filter(pk__in=service_ids).values_list("pk", "name")
+
+
+def build_summary(start, end, rows, names):
+    per_service = []
+    totals = {"confirmed": 0, "completed": 0, "cancelled": 0, "revenue": Decimal("0")}
+    for row in rows:
+        row["name"] = names.get(row["service_id"], "Deleted services")
+        per_service.append(row)
+        for field in totals:
+            totals[field] += row[field] or 0
+    per_service.sort(key=lambda r: r["name"])
+
+    slots_per_day = len(Booking._meta.get_field("time").choices)
+    available = ((end - start).days + 1) * slots_per_day
+    held = totals["confirmed"] + totals["completed"]
+    return {
+        "start": start,
+        "end": end,
+        "per_service": per_service,
+        "totals": totals,
+        "utilisation": round(100 * held / available, 1) if available else 0,
+    }
+
+
+def summary(start, end):
+    """
+    Totals per service and overall for dates in [start, end], with slot
+    utilisation (held slots / available slots) for the period.
+    """
+    rows = list(summary_query(start, end))
+    names = dict(service_names_query([r["service_id"] for r in rows]))
+    return build_summary(start, end, rows, names)
+
+
+async def asummary(start, end):
+    """summary for async views, using the async ORM."""
+    rows = [row async for row in summary_query(start, end)]
+    names = {pk: name async for pk, name in service_names_query([r["service_id"] for r in rows])}
+    return build_summary(start, end, rows, names)
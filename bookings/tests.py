@@ -1,3 +1,218 @@
-from django.test import TestCase
+import csv
+import random
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from accounts.models import User
+from archive.archiver import run_archive
+from archive.models import ArchiveRun
+from services.models import Service
+from . import stats
+from .availability import SlotTaken, free_slots_in_range, insert_booking
+from .export import csv_lines
+from .forms import BookingCreateForm
+from .models import ArchivedBooking, Booking, DailyBookingStats, hour_choices
+from .transitions import transition_booking
 
-# Create your tests here.
+
+def make_service(name="Full Groom", **fields):
+    return Service.objects.create(
+        name=name,
+        description="Wash, dry and trim.",
+        includes="Bath\nTrim",
+        price_small=Decimal("20.00"),
+        price_medium=Decimal("30.00"),
+        price_large=Decimal("40.00"),
+        **fields,
+    )
+
+
+def make_user(email="owner@example.com", **fields):
+    fields.setdefault("first_name", "Sam")
+    fields.setdefault("last_name", "Owner")
+    return User.objects.create_user(email, "pw-12345!", **fields)
+
+
+def make_booking(user, service, date, slot, **fields):
+    fields.setdefault("breed_size", Booking.BreedSize.SMALL)
+    return Booking.objects.create(user=user, service=service, date=date, time=slot, **fields)
+
+
+def rollup():
+    """The stats rollup as {(date, service_id, breed_size): counts}, minus empty buckets."""
+    return {
+        (row.date, row.service_id, row.breed_size): (row.confirmed, row.completed, row.cancelled, row.revenue)
+        for row in DailyBookingStats.objects.all()
+        if row.confirmed or row.completed or row.cancelled or row.revenue
+    }
+
+
+class SlotTests(TestCase):
+    """Double booking and the availability index as bookings change."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.service = make_service()
+        self.day = timezone.localdate() + timedelta(days=30)
+        self.ten, self.eleven = [t for (t, _label) in hour_choices(10, 11)]
+
+    def free_times(self, day):
+        slots, _ = free_slots_in_range(day, 1)
+        return {t for (t, _label) in slots[day]}
+
+    def test_form_rejects_a_taken_slot(self):
+        make_booking(self.user, self.service, self.day, self.ten)
+        form = BookingCreateForm(data={
+            "date": self.day.isoformat(),
+            "time": self.ten.strftime("%H:%M:%S"),
+            "service": self.service.pk,
+            "breed_size": Booking.BreedSize.SMALL,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn("time", form.errors)
+
+    def test_insert_rejects_a_double_booking(self):
+        make_booking(self.user, self.service, self.day, self.ten)
+        clash = Booking(
+            user=make_user("other@example.com"), service=self.service,
+            date=self.day, time=self.ten, breed_size=Booking.BreedSize.LARGE,
+        )
+        with self.assertRaises(SlotTaken) as caught:
+            insert_booking(clash)
+        self.assertEqual(Booking.objects.filter(date=self.day, time=self.ten).count(), 1)
+        self.assertNotIn((self.day, self.ten), [(d, t) for (d, t, _label) in caught.exception.suggestions])
+
+    def test_cancelled_slot_is_free_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = make_booking(self.user, self.service, self.day, self.ten)
+        self.assertNotIn(self.ten, self.free_times(self.day))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_booking(booking, Booking.Status.CANCELLED)
+        self.assertIn(self.ten, self.free_times(self.day))
+
+        # The slot can be booked again
+        make_booking(make_user("other@example.com"), self.service, self.day, self.ten)
+
+    def test_edited_booking_frees_its_old_slot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = make_booking(self.user, self.service, self.day, self.ten)
+        self.assertNotIn(self.ten, self.free_times(self.day))
+
+        next_day = self.day + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.date, booking.time = next_day, self.eleven
+            booking.save()
+        self.assertIn(self.ten, self.free_times(self.day))
+        self.assertNotIn(self.eleven, self.free_times(next_day))
+
+
+class StatsTests(TestCase):
+    """The rollup kept by signals and transitions agrees with a rebuild."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.service = make_service()
+
+    def assertRollupMatchesRebuild(self):
+        kept = rollup()
+        stats.rebuild()
+        self.assertEqual(kept, rollup())
+
+    def test_transitions_and_edits(self):
+        day = timezone.localdate() + timedelta(days=10)
+        slots = [t for (t, _label) in hour_choices(9, 12)]
+        bookings = [make_booking(self.user, self.service, day, t) for t in slots]
+        transition_booking(bookings[0], Booking.Status.COMPLETED)
+        transition_booking(bookings[1], Booking.Status.CANCELLED)
+        bookings[2].breed_size = Booking.BreedSize.LARGE
+        bookings[2].save()
+        bookings[3].delete()
+        self.assertRollupMatchesRebuild()
+
+    def test_archived_bookings_stay_counted(self):
+        past = timezone.localdate() - timedelta(days=40)
+        slots = [t for (t, _label) in hour_choices(9, 11)]
+        make_booking(self.user, self.service, past, slots[0], status=Booking.Status.COMPLETED)
+        make_booking(self.user, self.service, past, slots[1], status=Booking.Status.CANCELLED)
+        make_booking(self.user, self.service, past, slots[2])
+        before = stats.summary(past, past)
+
+        run = run_archive(ArchiveRun.Kind.BOOKINGS, age=timedelta(days=1))
+
+        self.assertEqual(run.moved, 2)
+        self.assertEqual(ArchivedBooking.objects.count(), 2)
+        self.assertEqual(stats.summary(past, past), before)
+        self.assertRollupMatchesRebuild()
+
+
+class ExportTests(TestCase):
+    def test_csv_escapes_formula_cells(self):
+        user = make_user(first_name="=cmd|' /C calc'!A0")
+        booking = make_booking(
+            user, make_service(), timezone.localdate() + timedelta(days=5), hour_choices(9, 9)[0][0],
+            notes="@SUM(1+1)",
+        )
+        [row] = csv.DictReader("".join(csv_lines(Booking.objects.all())).splitlines())
+        self.assertEqual(row["notes"], "'@SUM(1+1)")
+        self.assertEqual(row["customer_name"], "'=cmd|' /C calc'!A0 Owner")
+        self.assertEqual(row["id"], str(booking.pk))
+        self.assertEqual(row["service"], "Full Groom")
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Threads racing for the same slots through the insert-first path."""
+
+    THREADS = 4
+    ATTEMPTS = 20
+
+    def test_no_slot_is_double_booked(self):
+        user = make_user()
+        service = make_service()
+        first_day = timezone.localdate() + timedelta(days=30)
+        slots = [(first_day, t) for (t, _label) in hour_choices(9, 12)]
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(self.ATTEMPTS):
+                    date, slot = random.choice(slots)
+                    booking = Booking(
+                        user=user, service=service, date=date, time=slot,
+                        breed_size=Booking.BreedSize.SMALL,
+                    )
+                    try:
+                        insert_booking(booking)
+                        outcome = "booked"
+                    except SlotTaken:
+                        outcome = "taken"
+                    except Exception:
+                        # Lock errors that outlast the retries; never a double booking
+                        outcome = "error"
+                    with lock:
+                        outcomes.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        doubled = (
+            Booking.objects
+            .filter(status__in=Booking.ACTIVE_STATUSES)
+            .values("date", "time")
+            .annotate(n=Count("id"))
+            .filter(n__gt=1)
+        )
+        self.assertFalse(doubled.exists())
+        self.assertEqual(outcomes.count("booked"), Booking.objects.count())
+        self.assertLessEqual(outcomes.count("booked"), len(slots))
+        self.assertIn("taken", outcomes)
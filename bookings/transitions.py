@@ -0,0 +1,102 @@
+"""
+Status transitions for bookings, applied in bounded chunks.
+
+Each chunk is one short transaction: the rows still in an allowed source
+status are locked and updated by a single guarded UPDATE, then the side
+effects for the whole chunk are applied as one batch (availability index,
+stats rollup and the bookings_transitioned signal). Bookings in any other
+status are skipped rather than failing the batch.
+"""
+from dataclasses import dataclass
+from django.db import transaction
+from django.utils import timezone
+from . import stats
+from .availability import refresh_days
+from .models import Booking
+from .signals import bookings_transitioned
+
+TRANSITION_CHUNK_SIZE = 500
+
+# Target status -> statuses a booking may move from
+ALLOWED_TRANSITIONS = {
+    Booking.Status.COMPLETED: (Booking.Status.CONFIRMED,),
+    Booking.Status.CANCELLED: (Booking.Status.CONFIRMED,),
+}
+
+
+@dataclass
+class TransitionResult:
+    changed: int = 0
+    skipped: int = 0
+
+
+def apply_chunk(pks, to_status, actor=None):
+    """Move the given bookings to to_status where allowed. Returns rows changed."""
+    allowed = ALLOWED_TRANSITIONS[to_status]
+    with transaction.atomic():
+        rows = list(
+            Booking.objects
+            .select_for_update()
+            .filter(pk__in=pks, status__in=allowed)
+            .values(
+                "pk", "user_id", "date", "time", "service_id", "service_name_snapshot",
+                "breed_size", "status", "price_snapshot",
+            )
+        )
+        if not rows:
+            return 0
+        changed_pks = [row.pop("pk") for row in rows]
+        Booking.objects.filter(pk__in=changed_pks, status__in=allowed).update(
+            status=to_status, updated_at=timezone.now(),
+        )
+
+        # One batch of side effects for the chunk
+        for row in rows:
+            row["price"] = row.pop("price_snapshot")
+        refresh_days({row["date"] for row in rows})
+        stats.record_status_change(rows, to_status)
+        bookings_transitioned.send(
+            sender=Booking,
+            pks=changed_pks,
+            from_states=rows,
+            to_status=to_status,
+            actor=actor,
+        )
+    return len(changed_pks)
+
+
+def transition(queryset, to_status, actor=None, chunk_size=TRANSITION_CHUNK_SIZE):
+    """
+    Move every booking in queryset to to_status, chunk by chunk in pk order.
+    Bookings not in an allowed source status are left alone and counted
+    as skipped.
+    """
+    if to_status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f"No transitions lead to {to_status!r}.")
+    result = TransitionResult()
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset
+            .filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            break
+        changed = apply_chunk(pks, to_status, actor)
+        result.changed += changed
+        result.skipped += len(pks) - changed
+        last_pk = pks[-1]
+    return result
+
+
+def transition_booking(booking, to_status, actor=None):
+    """Move a single booking. Returns True if its status changed."""
+    changed = apply_chunk([booking.pk], to_status, actor) == 1
+    if changed:
+        booking.status = to_status
+        loaded = getattr(booking, "_loaded_values", None)
+        if loaded:
+            loaded["status"] = to_status
+    return changed
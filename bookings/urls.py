@@ -5,5 +5,7 @@ app_name = "bookings"
 
 urlpatterns = [
     path("", views.booking_create_page, name="booking_create_page"),
+    path("availability/", views.availability_range, name="availability"),
+    path("slots/next/", views.next_slots, name="next_slots"),
     path("<int:pk>/cancel/", views.booking_cancel, name="booking_cancel"),
 ]
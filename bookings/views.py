@@ -1,10 +1,28 @@
+import hashlib
+import json
+from datetime import date, datetime
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
 from django.shortcuts import redirect, render, get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+from .availability import SlotTaken, afree_slots_in_range
 from .forms import BookingCreateForm
 from .models import Booking
+from .search import next_free_slots
+from .transitions import transition_booking
+
+# Availability range requests (days per response)
+AVAILABILITY_DEFAULT_DAYS = 35
+AVAILABILITY_MAX_DAYS = 62
+
+# Next-free-slot search (results per request)
+SEARCH_DEFAULT_COUNT = 5
+SEARCH_MAX_COUNT = 50
 
 
 def booking_create_page(request):
@@ -14,11 +32,21 @@ def booking_create_page(request):
         # either redirect to login, or back to the same page - your choice
         return redirect(f"{reverse('accounts:login')}?next={request.path}")
 
+    suggestions = []
     if request.method == "POST":
         form = BookingCreateForm(request.POST)
         if form.is_valid():
             try:
                 form.save(user=request.user)
+            except SlotTaken as e:
+                # Lost the race for this slot, offer the nearest free ones
+                form.fields["time"].choices = form.time_choices(e.booking.date)
+                form.add_error(
+                    "time",
+                    "Sorry, this time slot was just booked. "
+                    "Please choose a different time.",
+                )
+                suggestions = e.suggestions
             except Exception as e:
                 messages.error(request, str(e))
             else:
@@ -26,11 +54,15 @@ def booking_create_page(request):
                 return redirect("bookings:booking_create_page")
     else:
         initial = {}
-        if "date" in request.GET:
-            initial["date"] = request.GET["date"]
+        for key in ("date", "time", "service"):
+            if key in request.GET:
+                initial[key] = request.GET[key]
         form = BookingCreateForm(initial=initial)
 
-    return render(request, "bookings/bookings.html", {"form": form})
+    return render(request, "bookings/bookings.html", {
+        "form": form,
+        "suggestions": suggestions,
+    })
 
 
 @login_required
@@ -41,7 +73,84 @@ def booking_cancel(request, pk):
     if booking.is_past:
         messages.error(request, "This booking has already passed and cannot be cancelled.", extra_tags="bookings")
         return redirect("accounts:account")
-    booking.status = Booking.Status.CANCELLED
-    booking.save(update_fields=["status"])
-    messages.success(request, "Booking cancelled.", extra_tags="bookings")
+    if transition_booking(booking, Booking.Status.CANCELLED, actor=request.user):
+        messages.success(request, "Booking cancelled.", extra_tags="bookings")
+    else:
+        messages.error(request, "This booking can no longer be cancelled.", extra_tags="bookings")
     return redirect("accounts:account")
+
+
+@require_GET
+async def availability_range(request):
+    """
+    Free slots for a range of dates as JSON, so the booking page can switch
+    dates client-side. Supports ETag / Last-Modified revalidation.
+    """
+    today = timezone.localdate()
+    start_str = request.GET.get("start")
+    try:
+        start = date.fromisoformat(start_str) if start_str else today
+        days = int(request.GET.get("days", AVAILABILITY_DEFAULT_DAYS))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid start or days.")
+    days = max(1, min(days, AVAILABILITY_MAX_DAYS))
+    start = max(start, today)
+
+    slots, last_modified = await afree_slots_in_range(start, days)
+    payload = {
+        "start": start.isoformat(),
+        "days": days,
+        "slots": {
+            d.isoformat(): [[t.isoformat(), label] for (t, label) in choices]
+            for d, choices in slots.items()
+        },
+    }
+    body = json.dumps(payload, separators=(",", ":"))
+    etag = '"%s"' % hashlib.md5(body.encode()).hexdigest()
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    if last_modified_ts:
+        response["Last-Modified"] = http_date(last_modified_ts)
+    patch_cache_control(response, public=True, max_age=30)
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified_ts, response=response
+    )
+
+
+@require_GET
+def next_slots(request):
+    """
+    The next free slots after a date/time as JSON.
+    Query: after (ISO date or datetime), count, weekday (repeatable,
+    Monday=0), from / to (first and last start hour).
+    """
+    try:
+        after = None
+        if request.GET.get("after"):
+            after = datetime.fromisoformat(request.GET["after"])
+            if timezone.is_naive(after):
+                after = timezone.make_aware(after)
+        count = int(request.GET.get("count", SEARCH_DEFAULT_COUNT))
+        weekdays = [int(w) for w in request.GET.getlist("weekday")] or None
+        hours = None
+        if request.GET.get("from") or request.GET.get("to"):
+            hours = (int(request.GET.get("from", 0)), int(request.GET.get("to", 23)))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid search parameters.")
+    if weekdays and not all(0 <= w <= 6 for w in weekdays):
+        return HttpResponseBadRequest("Weekdays must be 0 (Monday) to 6 (Sunday).")
+    count = max(1, min(count, SEARCH_MAX_COUNT))
+
+    slots = next_free_slots(after=after, count=count, weekdays=weekdays, hours=hours)
+    return JsonResponse({
+        "slots": [
+            {
+                "date": s.date().isoformat(),
+                "time": s.time().isoformat(),
+                "label": f"{s:%a %d %b} @ {s:%H:%M}",
+            }
+            for s in (timezone.localtime(s) for s in slots)
+        ],
+    })
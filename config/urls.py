@@ -1,14 +1,18 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import render
+from core.pagecache import anonymous_page_cache
+from core.views import csrf_token
 
 
+@anonymous_page_cache
 def home(request):
     return render(request, "index.html")
 
 
 urlpatterns = [
     path("", home, name="home"),
+    path("csrf/", csrf_token, name="csrf"),
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls", namespace="accounts")),
     path("services/", include("services.urls", namespace="services")),
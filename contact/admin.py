@@ -1,11 +1,26 @@
 from django.contrib import admin
-from .models import ContactMessage
+from .models import ArchivedMessage, ContactMessage
 
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ("email", "subject", "created_at")
-    list_filter = ("created_at",)
+    list_display = ("email", "subject", "created_at", "is_read", "is_archived")
+    list_filter = ("created_at", "is_read", "is_archived")
     search_fields = ("email", "first_name", "last_name")
     ordering = ("created_at",)  # oldest first in admin list
-    readonly_fields = ("created_at",)
+    readonly_fields = ("created_at", "is_read", "is_archived")
+
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    list_display = ("email", "subject", "created_at", "archived_at")
+    list_filter = ("created_at",)
+    search_fields = ("email", "first_name", "last_name")
+    ordering = ("-created_at",)
+
+    # Moved here by archive_records; kept read-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,90 @@
+"""
+Inbox state for contact messages: read/archived flags and the running
+counters behind the dashboard badges.
+
+State changes lock the message, save the new flags and apply the counter
+difference in one transaction, so counters only move on real changes.
+"""
+from django.db import transaction
+from django.db.models import F
+from .models import ContactMessage, InboxCounter
+
+COUNTERS = ("inbox", "unread", "archived")
+
+# Dashboard folders: name -> filter
+FOLDERS = {
+    "inbox": {"is_archived": False},
+    "unread": {"is_archived": False, "is_read": False},
+    "archived": {"is_archived": True},
+}
+
+
+def counter_values(is_read, is_archived):
+    """What one message in this state adds to each counter."""
+    return {
+        "inbox": int(not is_archived),
+        "unread": int(not is_archived and not is_read),
+        "archived": int(is_archived),
+    }
+
+
+def bump(changes):
+    changes = {name: value for name, value in changes.items() if value}
+    if not changes:
+        return
+    with transaction.atomic():
+        InboxCounter.objects.bulk_create(
+            [InboxCounter(name=name) for name in changes], ignore_conflicts=True,
+        )
+        for name, value in sorted(changes.items()):
+            InboxCounter.objects.filter(name=name).update(value=F("value") + value)
+
+
+def change_state(pk, **flags):
+    """Set is_read and/or is_archived on a message. Returns the message."""
+    with transaction.atomic():
+        message = ContactMessage.objects.select_for_update().get(pk=pk)
+        before = counter_values(message.is_read, message.is_archived)
+        for name, value in flags.items():
+            setattr(message, name, value)
+        message.save(update_fields=list(flags))
+        after = counter_values(message.is_read, message.is_archived)
+        bump({name: after[name] - before[name] for name in COUNTERS})
+    return message
+
+
+def mark_read(pk, read=True):
+    return change_state(pk, is_read=read)
+
+
+def set_archived(pk, archived=True):
+    return change_state(pk, is_archived=archived)
+
+
+def counts():
+    """Current counter values (one query)."""
+    values = dict.fromkeys(COUNTERS, 0)
+    values.update(InboxCounter.objects.values_list("name", "value"))
+    return values
+
+
+async def acounts():
+    values = dict.fromkeys(COUNTERS, 0)
+    async for name, value in InboxCounter.objects.values_list("name", "value"):
+        values[name] = value
+    return values
+
+
+def rebuild_counters():
+    """Recount every counter from the messages table."""
+    totals = dict.fromkeys(COUNTERS, 0)
+    rows = ContactMessage.objects.values_list("is_read", "is_archived")
+    for is_read, is_archived in rows.iterator():
+        for name, value in counter_values(is_read, is_archived).items():
+            totals[name] += value
+    with transaction.atomic():
+        InboxCounter.objects.all().delete()
+        InboxCounter.objects.bulk_create(
+            [InboxCounter(name=name, value=value) for name, value in totals.items()]
+        )
+    return totals
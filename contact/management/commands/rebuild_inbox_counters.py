@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from contact.inbox import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the inbox counters (inbox, unread, archived) from the messages table."
+
+    def handle(self, *args, **options):
+        totals = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{name}: {value}" for name, value in totals.items())
+        ))
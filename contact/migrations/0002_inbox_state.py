@@ -0,0 +1,48 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+def init_inbox(apps, schema_editor):
+    ContactMessage = apps.get_model("contact", "ContactMessage")
+    InboxCounter = apps.get_model("contact", "InboxCounter")
+
+    # Messages from before read tracking were already listed to staff
+    ContactMessage.objects.update(is_read=True)
+    InboxCounter.objects.bulk_create([
+        InboxCounter(name="inbox", value=ContactMessage.objects.count()),
+        InboxCounter(name="unread", value=0),
+        InboxCounter(name="archived", value=0),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxCounter',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('value', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='is_read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_archived', 'created_at'], name='contact_con_is_arch_275339_idx'),
+        ),
+        migrations.RunPython(init_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# Full-text search over subject, message and email, in the form the
+# configured database supports (see contact.search)
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE contact_message_fts USING fts5(
+        subject, message, email,
+        content='contact_contactmessage', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER contact_message_fts_ai AFTER INSERT ON contact_contactmessage BEGIN
+        INSERT INTO contact_message_fts(rowid, subject, message, email)
+        VALUES (new.id, new.subject, new.message, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER contact_message_fts_ad AFTER DELETE ON contact_contactmessage BEGIN
+        INSERT INTO contact_message_fts(contact_message_fts, rowid, subject, message, email)
+        VALUES ('delete', old.id, old.subject, old.message, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER contact_message_fts_au AFTER UPDATE OF subject, message, email
+    ON contact_contactmessage BEGIN
+        INSERT INTO contact_message_fts(contact_message_fts, rowid, subject, message, email)
+        VALUES ('delete', old.id, old.subject, old.message, old.email);
+        INSERT INTO contact_message_fts(rowid, subject, message, email)
+        VALUES (new.id, new.subject, new.message, new.email);
+    END
+    """,
+    "INSERT INTO contact_message_fts(contact_message_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS contact_message_fts_au",
+    "DROP TRIGGER IF EXISTS contact_message_fts_ad",
+    "DROP TRIGGER IF EXISTS contact_message_fts_ai",
+    "DROP TABLE IF EXISTS contact_message_fts",
+]
+
+POSTGRES_CREATE = [
+    """
+    ALTER TABLE contact_contactmessage ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(subject, '')), 'A')
+        || to_tsvector('english', coalesce(message, ''))
+        || to_tsvector('simple', coalesce(email, ''))
+    ) STORED
+    """,
+    "CREATE INDEX contact_message_search_idx ON contact_contactmessage USING GIN (search_vector)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS contact_message_search_idx",
+    "ALTER TABLE contact_contactmessage DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0002_inbox_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_CREATE, "postgresql": POSTGRES_CREATE}),
+            run_for_vendor({"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}),
+        ),
+    ]
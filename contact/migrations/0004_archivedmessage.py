@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0003_message_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('email', models.EmailField(max_length=254)),
+                ('first_name', models.CharField(max_length=35)),
+                ('last_name', models.CharField(max_length=35)),
+                ('subject', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('created_at',),
+                'indexes': [models.Index(fields=['created_at'], name='contact_arc_created_3c4bb8_idx')],
+            },
+        ),
+    ]
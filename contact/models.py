@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 
 class ContactMessage(models.Model):
@@ -10,11 +10,73 @@ class ContactMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Inbox state, changed through contact.inbox so counters stay right
+    is_read = models.BooleanField(default=False)
+    is_archived = models.BooleanField(default=False)
+
     class Meta:
         ordering = ("created_at",)  # oldest first
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["is_archived", "created_at"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The message and its counter updates commit together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d} - {self.email} - {self.subject[:40]}"
+
+
+class ArchivedMessage(models.Model):
+    '''
+    Compact copy of an old handled (read or archived) contact message.
+    - Moved out of ContactMessage by `manage.py archive_records`, keeping
+      its id; inbox counters are adjusted as it leaves.
+    - Shown in the dashboard's "Older" folder, not counted in any badge.
+    '''
+    id = models.BigIntegerField(primary_key=True)
+    email = models.EmailField()
+    first_name = models.CharField(max_length=35)
+    last_name = models.CharField(max_length=35)
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(
+            id=message.pk,
+            email=message.email,
+            first_name=message.first_name,
+            last_name=message.last_name,
+            subject=message.subject,
+            message=message.message,
+            created_at=message.created_at,
+        )
+
+    class Meta:
+        ordering = ("created_at",)
         indexes = [
             models.Index(fields=["created_at"]),
         ]
 
     def __str__(self):
         return f"{self.created_at:%Y-%m-%d} - {self.email} - {self.subject[:40]}"
+
+
+class InboxCounter(models.Model):
+    '''
+    Running totals for the dashboard inbox, so badges never COUNT(*).
+    - One row per name in contact.inbox.COUNTERS.
+    - Adjusted with F() increments by contact.inbox and its signals;
+      rebuild with `manage.py rebuild_inbox_counters`.
+    '''
+    name = models.CharField(max_length=20, primary_key=True)
+    value = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
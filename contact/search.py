@@ -0,0 +1,43 @@
+"""
+Full-text search over contact messages (subject, message and email).
+
+Uses the index created by migration 0003: an FTS5 table kept in sync by
+triggers on SQLite, or a generated tsvector column with a GIN index on
+Postgres. Other databases fall back to icontains matching. On SQLite a
+migration that rebuilds contact_contactmessage drops the triggers, so
+such a migration must recreate them.
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+def fts5_query(text):
+    """Every term must match, each as a quoted prefix ("dog"* "wash"*)."""
+    terms = ['"%s"*' % term.replace('"', '""') for term in text.split()]
+    return " ".join(terms)
+
+
+def search_messages(queryset, text):
+    """Filter a ContactMessage queryset to messages matching `text`."""
+    text = (text or "").strip()
+    if not text:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        return queryset.filter(pk__in=RawSQL(
+            "SELECT rowid FROM contact_message_fts WHERE contact_message_fts MATCH %s",
+            [fts5_query(text)],
+        ))
+    if vendor == "postgresql":
+        return queryset.filter(pk__in=RawSQL(
+            "SELECT id FROM contact_contactmessage "
+            "WHERE search_vector @@ websearch_to_tsquery('english', %s)",
+            [text],
+        ))
+    for term in text.split():
+        queryset = queryset.filter(
+            Q(subject__icontains=term) | Q(message__icontains=term) | Q(email__icontains=term)
+        )
+    return queryset
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import inbox
+from .models import ContactMessage
+
+
+@receiver(post_save, sender=ContactMessage)
+def message_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        inbox.bump(inbox.counter_values(instance.is_read, instance.is_archived))
+
+
+@receiver(post_delete, sender=ContactMessage)
+def message_deleted(sender, instance, **kwargs):
+    values = inbox.counter_values(instance.is_read, instance.is_archived)
+    inbox.bump({name: -value for name, value in values.items()})
@@ -1,3 +1,41 @@
 from django.test import TestCase
+from django.urls import reverse
+from . import inbox
+from .models import ContactMessage
 
-# Create your tests here.
+
+class InboxCounterTests(TestCase):
+    """The dashboard badges follow messages through their states."""
+
+    def send(self, **fields):
+        data = {
+            "email": "owner@example.com",
+            "first_name": "Sam",
+            "last_name": "Owner",
+            "subject": "Nail trim",
+            "message": "Do you trim nails?",
+        }
+        data.update(fields)
+        return self.client.post(reverse("contact:contact"), data)
+
+    def test_sent_message_is_counted_as_unread(self):
+        response = self.send()
+        self.assertRedirects(response, reverse("contact:contact"))
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(inbox.counts(), {"inbox": 1, "unread": 1, "archived": 0})
+
+    def test_invalid_message_is_not_saved(self):
+        response = self.send(email="not-an-email")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ContactMessage.objects.exists())
+
+    def test_counters_only_move_on_real_changes(self):
+        self.send()
+        self.send(subject="Second")
+        first = ContactMessage.objects.order_by("pk").first()
+        inbox.mark_read(first.pk)
+        inbox.mark_read(first.pk)
+        inbox.set_archived(first.pk)
+        self.assertEqual(inbox.counts(), {"inbox": 1, "unread": 1, "archived": 1})
+        inbox.rebuild_counters()
+        self.assertEqual(inbox.counts(), {"inbox": 1, "unread": 1, "archived": 1})
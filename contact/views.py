@@ -1,8 +1,10 @@
 from django.contrib import messages
 from django.shortcuts import render, redirect
+from core.pagecache import anonymous_page_cache
 from .forms import ContactMessageForm
 
 
+@anonymous_page_cache
 def contact_view(request):
     if request.method == "POST":
         form = ContactMessageForm(request.POST)
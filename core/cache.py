@@ -0,0 +1,223 @@
+"""
+Helpers over the shared cache tier (settings.CACHES["default"]).
+
+- Versioned keys: every key lives in a namespace whose version is stored
+  in the cache; bump_version() makes all of a namespace's keys unreachable
+  at once, on every worker, without deleting them.
+- Soft TTL with single flight: get_or_compute() keeps an entry for `ttl`
+  but treats it as fresh for `soft_ttl` only. After that, the one caller
+  that wins an add() lock recomputes while everyone else is served the
+  stale value; on a cold key the others wait briefly for the winner
+  instead of all hitting the database.
+- Hit/miss counters: counted in process and added to shared counters
+  every COUNTER_FLUSH_INTERVAL seconds (and at exit), so a hit costs no
+  extra writes.
+  Read them with stats() or `manage.py cache_stats`.
+
+Versions and counters are kept in the "state" cache alias, away from the
+values, so a full default cache culling its entries cannot drop them.
+"""
+import asyncio
+import atexit
+import threading
+import time
+from collections import Counter
+from asgiref.sync import sync_to_async
+from django.core.cache import cache, caches
+from django.utils.connection import ConnectionProxy
+
+DEFAULT_TTL = 300
+
+# A recompute holding the lock longer than this is presumed dead
+LOCK_TIMEOUT = 30
+
+# How long callers wait for another worker to fill a cold key
+FILL_WAIT = 2.0
+FILL_POLL = 0.05
+
+COUNTER_FLUSH_INTERVAL = 10
+COUNTER_KINDS = ("hit", "stale", "miss", "refresh")
+NAMESPACES_KEY = "cachestats:namespaces"
+
+state = ConnectionProxy(caches, "state")
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+# Versioned keys
+def version_key(namespace):
+    return f"{namespace}:version"
+
+
+def versioned_key(namespace, key, version):
+    return f"{namespace}:v{version}:{key}"
+
+
+def bump_version(namespace):
+    """Invalidate every key in the namespace."""
+    try:
+        state.incr(version_key(namespace))
+    except ValueError:
+        # No version yet (or it was evicted); anything cached is unreachable
+        # once a version exists, so start from a fresh value
+        state.set(version_key(namespace), int(time.time()), None)
+
+
+def current_key(namespace, key):
+    return versioned_key(namespace, key, state.get(version_key(namespace), 0))
+
+
+async def acurrent_key(namespace, key):
+    return versioned_key(namespace, key, await state.aget(version_key(namespace), 0))
+
+
+# Counters
+def tally(namespace, kind):
+    """Count locally; returns the counts to flush when a flush is due."""
+    global _last_flush
+    with _counts_lock:
+        _counts[namespace, kind] += 1
+        if time.monotonic() - _last_flush < COUNTER_FLUSH_INTERVAL:
+            return None
+        pending = dict(_counts)
+        _counts.clear()
+        _last_flush = time.monotonic()
+    return pending
+
+
+def count(namespace, kind):
+    pending = tally(namespace, kind)
+    if pending:
+        flush_counts(pending)
+
+
+async def acount(namespace, kind):
+    pending = tally(namespace, kind)
+    if pending:
+        # Database-backed caches cannot be used from the event loop directly
+        await sync_to_async(flush_counts)(pending)
+
+
+@atexit.register
+def flush_remaining():
+    with _counts_lock:
+        pending = dict(_counts)
+        _counts.clear()
+    if pending:
+        flush_counts(pending)
+
+
+def flush_counts(pending):
+    namespaces = set(state.get(NAMESPACES_KEY, ()))
+    for (namespace, kind), value in pending.items():
+        key = f"cachestats:{namespace}:{kind}"
+        state.add(key, 0, None)
+        try:
+            state.incr(key, value)
+        except ValueError:
+            state.set(key, value, None)
+        namespaces.add(namespace)
+    state.set(NAMESPACES_KEY, sorted(namespaces), None)
+
+
+def stats(namespace=None):
+    """Shared counters per namespace (this process's unflushed counts included)."""
+    with _counts_lock:
+        local = dict(_counts)
+    namespaces = [namespace] if namespace else state.get(NAMESPACES_KEY, [])
+    namespaces = sorted(set(namespaces) | {ns for ns, _ in local if not namespace or ns == namespace})
+    keys = [f"cachestats:{ns}:{kind}" for ns in namespaces for kind in COUNTER_KINDS]
+    shared = state.get_many(keys)
+    return {
+        ns: {
+            kind: shared.get(f"cachestats:{ns}:{kind}", 0) + local.get((ns, kind), 0)
+            for kind in COUNTER_KINDS
+        }
+        for ns in namespaces
+    }
+
+
+# Soft TTL, single flight
+def fresh(entry, now):
+    return entry is not None and entry["fresh_until"] > now
+
+
+def pack(value, soft_ttl, now):
+    return {"value": value, "fresh_until": now + soft_ttl}
+
+
+def get_or_compute(namespace, key, compute, ttl=DEFAULT_TTL, soft_ttl=None):
+    """
+    The cached value for `key` in `namespace`, computing it with compute()
+    when missing or past soft_ttl (default: ttl). Only one caller at a time
+    recomputes a key.
+    """
+    soft_ttl = ttl if soft_ttl is None else soft_ttl
+    full_key = current_key(namespace, key)
+    entry = cache.get(full_key)
+    now = time.time()
+    if fresh(entry, now):
+        count(namespace, "hit")
+        return entry["value"]
+
+    lock_key = f"{full_key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            count(namespace, "miss" if entry is None else "refresh")
+            value = compute()
+            cache.set(full_key, pack(value, soft_ttl, time.time()), ttl)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        count(namespace, "stale")
+        return entry["value"]
+
+    # Cold key being filled by another caller: wait for it, then give up
+    deadline = now + FILL_WAIT
+    while time.time() < deadline:
+        time.sleep(FILL_POLL)
+        entry = cache.get(full_key)
+        if entry is not None:
+            count(namespace, "hit")
+            return entry["value"]
+    count(namespace, "miss")
+    return compute()
+
+
+async def aget_or_compute(namespace, key, compute, ttl=DEFAULT_TTL, soft_ttl=None):
+    """get_or_compute for async views; compute is an async callable."""
+    soft_ttl = ttl if soft_ttl is None else soft_ttl
+    full_key = await acurrent_key(namespace, key)
+    entry = await cache.aget(full_key)
+    now = time.time()
+    if fresh(entry, now):
+        await acount(namespace, "hit")
+        return entry["value"]
+
+    lock_key = f"{full_key}:lock"
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            await acount(namespace, "miss" if entry is None else "refresh")
+            value = await compute()
+            await cache.aset(full_key, pack(value, soft_ttl, time.time()), ttl)
+            return value
+        finally:
+            await cache.adelete(lock_key)
+
+    if entry is not None:
+        await acount(namespace, "stale")
+        return entry["value"]
+
+    deadline = now + FILL_WAIT
+    while time.time() < deadline:
+        await asyncio.sleep(FILL_POLL)
+        entry = await cache.aget(full_key)
+        if entry is not None:
+            await acount(namespace, "hit")
+            return entry["value"]
+    await acount(namespace, "miss")
+    return await compute()
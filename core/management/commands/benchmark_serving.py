@@ -0,0 +1,103 @@
+import os
+import statistics
+import subprocess
+import sys
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import urlopen
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+DEFAULT_PATHS = ("/services/", "/bookings/availability/")
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn in WSGI and ASGI mode (see gunicorn.conf.py) against "
+        "the configured database and compare concurrent-request throughput. "
+        "Run once per database setup, e.g. with a SQLite and a Postgres "
+        "DATABASE_URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=("wsgi", "asgi"), default=["wsgi", "asgi"])
+        parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable).")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per mode and path.")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or list(DEFAULT_PATHS)
+        self.stdout.write(
+            f"Database: {connection.vendor}; {options['workers']} worker(s), "
+            f"concurrency {options['concurrency']}, {options['requests']} requests per path"
+        )
+        for mode in options["modes"]:
+            server = self.start_server(mode, options)
+            try:
+                for path in paths:
+                    url = f"http://127.0.0.1:{options['port']}{path}"
+                    self.report(mode, path, self.run_load(url, options))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    def start_server(self, mode, options):
+        env = dict(
+            os.environ,
+            SERVER_MODE=mode,
+            PORT=str(options["port"]),
+            WEB_CONCURRENCY=str(options["workers"]),
+            DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE),
+        )
+        config = os.path.join(settings.BASE_DIR, "gunicorn.conf.py")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", config, "--access-logfile", "/dev/null"],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        # Wait for the workers to accept connections
+        deadline = clock.monotonic() + 30
+        while clock.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited in {mode} mode (is uvicorn-worker installed?).")
+            try:
+                urlopen(f"http://127.0.0.1:{options['port']}/", timeout=1).close()
+                return server
+            except (URLError, OSError):
+                clock.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"gunicorn did not start in {mode} mode.")
+
+    def run_load(self, url, options):
+        def fetch(_):
+            started = clock.perf_counter()
+            try:
+                with urlopen(url, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (URLError, OSError):
+                ok = False
+            return ok, clock.perf_counter() - started
+
+        started = clock.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            results = list(pool.map(fetch, range(options["requests"])))
+        elapsed = clock.perf_counter() - started
+        latencies = sorted(t for _ok, t in results)
+        return {
+            "rps": len(results) / elapsed,
+            "errors": sum(1 for ok, _t in results if not ok),
+            "p50": statistics.median(latencies) * 1000,
+            "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+
+    def report(self, mode, path, result):
+        self.stdout.write(
+            f"{mode.upper():5} {path:30} {result['rps']:8.1f} req/s  "
+            f"p50 {result['p50']:6.1f}ms  p95 {result['p95']:6.1f}ms  "
+            f"{result['errors']} errors"
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from core.cache import COUNTER_KINDS, stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Show hit/miss counters per cache namespace (see core.cache). "
+        "Workers flush their counts every few seconds, so the latest "
+        "requests may not be included yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("namespace", nargs="?", help="Only show this namespace.")
+
+    def handle(self, *args, **options):
+        counters = stats(options["namespace"])
+        if not counters:
+            self.stdout.write("No cache activity recorded.")
+            return
+        width = max(len(ns) for ns in counters)
+        self.stdout.write(
+            f"{'namespace':<{width}}  " + "  ".join(f"{kind:>8}" for kind in COUNTER_KINDS) + "  hit rate"
+        )
+        for namespace, counts in counters.items():
+            served = counts["hit"] + counts["stale"]
+            total = served + counts["miss"] + counts["refresh"]
+            rate = f"{served / total:.0%}" if total else "-"
+            self.stdout.write(
+                f"{namespace:<{width}}  " + "  ".join(f"{counts[kind]:>8}" for kind in COUNTER_KINDS) + f"  {rate:>8}"
+            )
@@ -0,0 +1,110 @@
+"""
+Full-page cache for anonymous GET requests.
+
+Only requests without a session or messages cookie are served from the
+cache, so nothing user-specific is ever stored. Cached pages render CSRF
+fields empty (see the csrf_input tag) and csrf-fill.js fetches a token
+when the page loads.
+
+Entries live in the "pagecache" namespace of core.cache, so invalidate()
+(e.g. from Service signals) drops them for every worker at once, and hits
+and misses show up in `manage.py cache_stats`.
+"""
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from .cache import acount, acurrent_key, bump_version, count, current_key
+
+NAMESPACE = "pagecache"
+
+# Response headers kept with a cached page
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Vary")
+
+
+def cacheable_request(request):
+    cookies = request.COOKIES
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in cookies
+        and getattr(settings, "MESSAGE_COOKIE_NAME", "messages") not in cookies
+    )
+
+
+def cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def page_digest(request):
+    return hashlib.md5(request.get_full_path().encode()).hexdigest()
+
+
+def pack(response):
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return {"content": response.content, "headers": headers}
+
+
+def unpack(request, entry):
+    response = HttpResponse(entry["content"])
+    for name, value in entry["headers"].items():
+        response[name] = value
+    # Revalidations still get a 304 from the cached validators
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+        response=response,
+    )
+
+
+def anonymous_page_cache(view):
+    """Serve the view's GET responses for anonymous visitors from the cache."""
+    timeout = settings.PAGE_CACHE_TIMEOUT
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not cacheable_request(request):
+                return await view(request, *args, **kwargs)
+            key = await acurrent_key(NAMESPACE, page_digest(request))
+            entry = await cache.aget(key)
+            if entry is not None:
+                await acount(NAMESPACE, "hit")
+                return unpack(request, entry)
+            await acount(NAMESPACE, "miss")
+            request.page_cacheable = True
+            response = await view(request, *args, **kwargs)
+            if cacheable_response(response):
+                await cache.aset(key, pack(response), timeout)
+            return response
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not cacheable_request(request):
+            return view(request, *args, **kwargs)
+        key = current_key(NAMESPACE, page_digest(request))
+        entry = cache.get(key)
+        if entry is not None:
+            count(NAMESPACE, "hit")
+            return unpack(request, entry)
+        count(NAMESPACE, "miss")
+        request.page_cacheable = True
+        response = view(request, *args, **kwargs)
+        if cacheable_response(response):
+            cache.set(key, pack(response), timeout)
+        return response
+    return wrapper
+
+
+def invalidate():
+    """Drop every cached page by moving to a new version."""
+    bump_version(NAMESPACE)
@@ -0,0 +1,121 @@
+"""
+Keyset (seek) pagination.
+
+Pages are addressed by an opaque cursor holding the sort key of the last
+row shown, so fetching page N costs the same as page 1 regardless of how
+many rows come before it.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    raw = json.dumps([None if v is None else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(model, keys, cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise InvalidCursor("Cursor does not match the sort keys.")
+        return [model._meta.get_field(key).to_python(value) for key, value in zip(keys, raw)]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor("Invalid cursor.") from exc
+
+
+def keyset_filter(keys, values, descending=False):
+    """
+    Rows strictly after `values` in (keys) order, expanded to
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... for portability.
+    """
+    op = "lt" if descending else "gt"
+    condition = Q()
+    for i, key in enumerate(keys):
+        term = Q(**{f"{key}__{op}": values[i]})
+        for prev_key, prev_value in zip(keys[:i], values[:i]):
+            term &= Q(**{prev_key: prev_value})
+        condition |= term
+    return condition
+
+
+def page_queryset(queryset, keys, cursor=None, descending=False):
+    """`queryset` ordered by `keys` and limited to rows after `cursor`."""
+    ordering = [f"-{k}" if descending else k for k in keys]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(queryset.model, keys, cursor)
+        queryset = queryset.filter(keyset_filter(keys, values, descending))
+    return queryset
+
+
+def page_from_rows(rows, keys, size):
+    """KeysetPage from up to size + 1 fetched rows."""
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, k) for k in keys])
+    return KeysetPage(rows, next_cursor)
+
+
+def keyset_page(queryset, keys, cursor=None, size=20, descending=False):
+    """
+    One page of `queryset` ordered by `keys` (unique together, e.g. ending
+    in "id"). Raises InvalidCursor for a malformed cursor.
+    """
+    keys = tuple(keys)
+    queryset = page_queryset(queryset, keys, cursor, descending)
+    return page_from_rows(list(queryset[:size + 1]), keys, size)
+
+
+async def akeyset_page(queryset, keys, cursor=None, size=20, descending=False):
+    """keyset_page for async views, using the async ORM."""
+    keys = tuple(keys)
+    queryset = page_queryset(queryset, keys, cursor, descending)
+    return page_from_rows([row async for row in queryset[:size + 1]], keys, size)
+
+
+def merge_rows(rows, keys, size, descending=False):
+    rows = sorted(rows, key=lambda row: [getattr(row, k) for k in keys], reverse=descending)
+    return page_from_rows(rows, keys, size)
+
+
+def merged_keyset_page(querysets, keys, cursor=None, size=20, descending=False):
+    """
+    keyset_page over several querysets read as one list, e.g. a hot table
+    and its archive table. They must share the key fields and key values
+    must be unique across them. Costs one page query per queryset.
+    """
+    keys = tuple(keys)
+    rows = []
+    for queryset in querysets:
+        rows.extend(page_queryset(queryset, keys, cursor, descending)[:size + 1])
+    return merge_rows(rows, keys, size, descending)
+
+
+async def amerged_keyset_page(querysets, keys, cursor=None, size=20, descending=False):
+    """merged_keyset_page for async views, using the async ORM."""
+    keys = tuple(keys)
+    rows = []
+    for queryset in querysets:
+        rows.extend([row async for row in page_queryset(queryset, keys, cursor, descending)[:size + 1]])
+    return merge_rows(rows, keys, size, descending)
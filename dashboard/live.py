@@ -0,0 +1,137 @@
+"""
+Live dashboard updates over server-sent events.
+
+Connected streams wait on an in-process broadcaster, which signal
+receivers poke after a booking event or contact message commits. Every
+wake-up (or poll interval, for changes made by other workers) reads what
+is new from the BookingEvent log and ContactMessage by id, so the
+database stays the source of truth and reconnecting clients resume from
+their Last-Event-ID. Both feeds hold back at id gaps that a transaction
+still in flight may fill (see bookings.events), so nothing is skipped.
+"""
+import asyncio
+import json
+import threading
+from django.db.models import Max
+from bookings.events import read_outbox, settled_count
+from bookings.models import BookingEvent
+from contact.models import ContactMessage
+
+# Seconds between database polls, and before a stream is closed for the
+# browser to reconnect
+LIVE_POLL_SECONDS = 5
+LIVE_MAX_SECONDS = 300
+LIVE_BATCH_SIZE = 100
+
+# Browser reconnect delay; under WSGI each request answers once, so this
+# is also the polling interval there
+LIVE_RETRY_MS = 5000
+
+
+class Broadcaster:
+    """Wakes the live streams running in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def subscribe(self):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        return waiter
+
+    def unsubscribe(self, waiter):
+        with self._lock:
+            self._waiters.discard(waiter)
+
+    def notify(self):
+        # Safe to call from any thread, e.g. an on_commit hook
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop already closed; the stream is going away
+                self.unsubscribe((loop, event))
+
+
+broadcaster = Broadcaster()
+
+
+def encode_cursor(cursor):
+    return f"{cursor[0]}-{cursor[1]}"
+
+
+def decode_cursor(value):
+    """(booking event id, message id) from a Last-Event-ID, or None."""
+    try:
+        booking_id, message_id = (int(part) for part in value.split("-"))
+    except (AttributeError, ValueError):
+        return None
+    return booking_id, message_id
+
+
+def current_cursor():
+    """Cursor at the newest booking event and message, so nothing replays."""
+    return (
+        BookingEvent.objects.aggregate(last=Max("pk"))["last"] or 0,
+        ContactMessage.objects.aggregate(last=Max("pk"))["last"] or 0,
+    )
+
+
+def read_changes(cursor):
+    """
+    New booking events and messages after cursor.
+    Returns a list of (event name, data, cursor after this item).
+    """
+    booking_after, message_after = cursor
+    changes = []
+    events, _ = read_outbox(booking_after, LIVE_BATCH_SIZE)
+    for event in events:
+        booking_after = event["id"]
+        data = {key: event[key] for key in ("id", "booking_id", "kind", "from_status", "to_status")}
+        changes.append(("booking", data, (booking_after, message_after)))
+
+    rows = list(
+        ContactMessage.objects
+        .filter(pk__gt=message_after)
+        .order_by("pk")
+        .values("pk", "first_name", "last_name", "subject", "created_at")[:LIVE_BATCH_SIZE]
+    )
+    rows = rows[:settled_count([(row["pk"], row["created_at"]) for row in rows], message_after)]
+    for row in rows:
+        message_after = row["pk"]
+        data = {"id": row["pk"], "name": f"{row['first_name']} {row['last_name']}", "subject": row["subject"]}
+        changes.append(("message", data, (booking_after, message_after)))
+    return changes
+
+
+def sse(event, data, cursor):
+    return f"id: {encode_cursor(cursor)}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream(cursor, read, once=False):
+    """
+    SSE lines for changes after cursor. `read` is an async read_changes.
+    With once=True (WSGI) the stream ends after the first read.
+    """
+    loop, changed = waiter = broadcaster.subscribe()
+    deadline = loop.time() + LIVE_MAX_SECONDS
+    try:
+        yield f"retry: {LIVE_RETRY_MS}\n"
+        yield sse("ready", {}, cursor)
+        while True:
+            changed.clear()
+            for event, data, cursor in await read(cursor):
+                yield sse(event, data, cursor)
+            if once or loop.time() >= deadline:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), LIVE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": ping\n\n"
+    finally:
+        broadcaster.unsubscribe(waiter)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from dashboard.models import ServiceRetirement
+from dashboard.retirement import RETIREMENT_BATCH_SIZE, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending service retirements started from the dashboard: detach "
+        "each service's bookings in batches, then delete the service. Safe "
+        "to re-run after an interruption."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RETIREMENT_BATCH_SIZE)
+        parser.add_argument(
+            "--retry-failed", action="store_true", help="Also rerun failed retirements.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            ServiceRetirement.objects.filter(
+                status=ServiceRetirement.Status.FAILED,
+            ).update(status=ServiceRetirement.Status.PENDING, error="")
+
+        done = run_pending(options["batch_size"])
+        for retirement in done:
+            self.stdout.write(f"{retirement.service_name}: {retirement.processed} booking(s) detached")
+        self.stdout.write(self.style.SUCCESS(f"{len(done)} retirement(s) completed."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetiredBookingLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(choices=[('service', 'Service'), ('original_service', 'Original service')], max_length=20)),
+                ('retirement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='links', to='dashboard.serviceretirement')),
+            ],
+        ),
+    ]
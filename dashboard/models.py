@@ -1,3 +1,75 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class ServiceRetirement(models.Model):
+    '''
+    Progress of deleting a service and detaching its bookings.
+    - Bookings keep the service name as a snapshot and lose their links in
+      batches (see dashboard.retirement), then the service is deleted.
+    - service_id is kept as a plain id so the record outlives the service.
+    - Small services are retired in the request; larger ones are queued
+      for the job worker (`manage.py retire_services` also runs them).
+    '''
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    service_id = models.PositiveBigIntegerField()
+    service_name = models.CharField(max_length=120)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    ACTIVE_STATUSES = (Status.PENDING, Status.RUNNING)
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.status == self.Status.DONE else 0
+        return min(100, round(100 * self.processed / self.total))
+
+    def __str__(self):
+        return f"Retire {self.service_name} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "service_id"]),
+        ]
+
+
+class RetiredBookingLink(models.Model):
+    '''
+    A booking link to the service that a retirement has cleared.
+    - Kept until the service is deleted, so a retirement that fails part
+      way can put the links back (stats stay under the service until then).
+    - booking_id is a plain id; the booking may be deleted meanwhile.
+    '''
+    class Field(models.TextChoices):
+        SERVICE = "service", "Service"
+        ORIGINAL_SERVICE = "original_service", "Original service"
+
+    retirement = models.ForeignKey(
+        ServiceRetirement,
+        on_delete=models.CASCADE,
+        related_name="links",
+    )
+    booking_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=20, choices=Field.choices)
+
+    def __str__(self):
+        return f"Booking {self.booking_id} {self.field} (retirement {self.retirement_id})"
@@ -0,0 +1,234 @@
+"""
+Service retirement: detach a service's bookings in bounded batches, then
+delete the service.
+
+Each batch is one UPDATE that fills any empty service name snapshot and
+clears the service links, so rows leave the working set as they are
+processed and a stopped run can simply be started again.
+
+Every batch (and the final delete) locks the service row and re-checks
+that it is still inactive with no confirmed bookings; the dashboard also
+refuses to edit or reactivate a service while it is being retired. A run
+that finds the service back in use, or fails for good, is marked failed
+and puts back the links it cleared (recorded as RetiredBookingLink rows),
+so the bookings again match the stats buckets still kept under the
+service.
+
+Runners (the request, the job worker, `retire_services`) claim a
+retirement with a guarded UPDATE before working on it, so only one of
+them processes it at a time.
+"""
+import logging
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from bookings.models import Booking
+from services.models import Service
+from .models import RetiredBookingLink, ServiceRetirement
+
+logger = logging.getLogger(__name__)
+
+RETIREMENT_BATCH_SIZE = 1000
+
+# Services with at most this many linked bookings are retired in the request
+INLINE_RETIREMENT_LIMIT = 2000
+
+# A running retirement not saved for this long belongs to a stopped runner
+RETIREMENT_STALE_AFTER = timedelta(minutes=5)
+
+
+def linked_bookings(service_id):
+    return Booking.objects.filter(Q(service_id=service_id) | Q(original_service_id=service_id))
+
+
+def being_retired(service_id):
+    return ServiceRetirement.objects.filter(
+        service_id=service_id, status__in=ServiceRetirement.ACTIVE_STATUSES,
+    ).exists()
+
+
+def check_retirable(service):
+    """Raise ValidationError unless the service is inactive with no confirmed bookings."""
+    if service.is_active or service.bookings.filter(status=Booking.Status.CONFIRMED).exists():
+        raise ValidationError("Service must be inactive and have no confirmed bookings.")
+
+
+def lock_retirable(service_id):
+    """
+    Lock the service row (if it still exists) and re-check it can be
+    retired. On Postgres the lock also holds off new bookings for it until
+    the caller's transaction ends.
+    """
+    service = Service.objects.select_for_update().filter(pk=service_id).first()
+    if service:
+        check_retirable(service)
+    return service
+
+
+def start_retirement(service, user=None):
+    """
+    Record a retirement for an inactive service with no confirmed bookings
+    and run it now when it is small, else queue it for the job worker.
+    Raises ValidationError otherwise. Returns the retirement as it stands
+    afterwards (done or failed when it ran inline).
+    """
+    check_retirable(service)
+    if being_retired(service.pk):
+        raise ValidationError("This service is already being deleted.")
+
+    retirement = ServiceRetirement.objects.create(
+        service_id=service.pk,
+        service_name=service.name,
+        total=linked_bookings(service.pk).count(),
+        requested_by=user,
+    )
+    if retirement.total <= INLINE_RETIREMENT_LIMIT:
+        try:
+            retirement = run_retirement(claim_retirement(retirement.pk))
+        except Exception:
+            # Recorded on the retirement as failed, for the caller to report
+            logger.exception("Retiring service %s failed", service.pk)
+            retirement.refresh_from_db()
+    else:
+        from .tasks import retire_service  # tasks imports this module
+
+        retire_service.enqueue(retirement_id=retirement.pk)
+    return retirement
+
+
+def detach_batch(retirement, batch_size=RETIREMENT_BATCH_SIZE):
+    """
+    Snapshot the name and clear the links on one batch, recording each
+    cleared link. Returns rows updated.
+    """
+    service_id = retirement.service_id
+    rows = list(
+        linked_bookings(service_id)
+        .order_by("pk")
+        .values_list("pk", "service_id", "original_service_id")[:batch_size]
+    )
+    if not rows:
+        return 0
+    RetiredBookingLink.objects.bulk_create([
+        RetiredBookingLink(retirement=retirement, booking_id=pk, field=field)
+        for pk, linked, original in rows
+        for field, value in (
+            (RetiredBookingLink.Field.SERVICE, linked),
+            (RetiredBookingLink.Field.ORIGINAL_SERVICE, original),
+        )
+        if value == service_id
+    ])
+    return Booking.objects.filter(pk__in=[pk for pk, _linked, _original in rows]).update(
+        service_name_snapshot=Case(
+            When(service_name_snapshot="", then=Value(retirement.service_name)),
+            default=F("service_name_snapshot"),
+        ),
+        service=Case(When(service_id=service_id, then=None), default=F("service_id")),
+        original_service=Case(
+            When(original_service_id=service_id, then=None),
+            default=F("original_service_id"),
+        ),
+    )
+
+
+def restore_links(retirement, batch_size=RETIREMENT_BATCH_SIZE):
+    """Put back the links a retirement cleared, batch by batch. Returns links restored."""
+    restored = 0
+    for field in RetiredBookingLink.Field.values:
+        links = retirement.links.filter(field=field).order_by("pk")
+        while True:
+            with transaction.atomic():
+                batch = list(links.values_list("pk", "booking_id")[:batch_size])
+                if not batch:
+                    break
+                # Left alone if the booking has been linked elsewhere since
+                restored += Booking.objects.filter(
+                    pk__in=[booking_id for _pk, booking_id in batch],
+                    **{f"{field}__isnull": True},
+                ).update(**{f"{field}_id": retirement.service_id})
+                RetiredBookingLink.objects.filter(pk__in=[pk for pk, _booking_id in batch]).delete()
+    return restored
+
+
+def abandon(retirement, error, batch_size=RETIREMENT_BATCH_SIZE):
+    """Mark a retirement failed, restoring its links while the service exists."""
+    retirement.status = ServiceRetirement.Status.FAILED
+    retirement.error = error
+    try:
+        if Service.objects.filter(pk=retirement.service_id).exists():
+            restore_links(retirement, batch_size)
+            retirement.processed = 0
+    except Exception:
+        # The links stay recorded; `retire_services --retry-failed` resumes
+        logger.exception("Restoring bookings for %s failed", retirement)
+    retirement.save(update_fields=["status", "error", "processed", "updated_at"])
+    return retirement
+
+
+def claim_retirement(retirement_id):
+    """
+    Mark a pending (or abandoned running) retirement as running for the
+    caller. Returns it, or None when it is finished or another runner has it.
+    """
+    now = timezone.now()
+    claimed = ServiceRetirement.objects.filter(
+        Q(status=ServiceRetirement.Status.PENDING)
+        | Q(status=ServiceRetirement.Status.RUNNING, updated_at__lt=now - RETIREMENT_STALE_AFTER),
+        pk=retirement_id,
+    ).update(status=ServiceRetirement.Status.RUNNING, updated_at=now)
+    return ServiceRetirement.objects.get(pk=retirement_id) if claimed else None
+
+
+def run_retirement(retirement, batch_size=RETIREMENT_BATCH_SIZE, final=True):
+    """
+    Process a retirement claimed with claim_retirement() to the end. An
+    error marks it failed when `final`, else leaves it pending for a retry.
+    """
+    try:
+        while True:
+            with transaction.atomic():
+                lock_retirable(retirement.service_id)
+                updated = detach_batch(retirement, batch_size)
+            if not updated:
+                break
+            retirement.processed += updated
+            retirement.save(update_fields=["processed", "updated_at"])
+
+        with transaction.atomic():
+            service = lock_retirable(retirement.service_id)
+            if service:
+                # Stats buckets are folded and cached pages dropped by Service signals
+                service.delete()
+            retirement.links.all().delete()
+    except ValidationError as exc:
+        # The service is in use again; there is nothing to retry
+        return abandon(retirement, exc.messages[0], batch_size)
+    except Exception as exc:
+        if final:
+            abandon(retirement, str(exc), batch_size)
+        else:
+            retirement.status = ServiceRetirement.Status.PENDING
+            retirement.error = str(exc)
+            retirement.save(update_fields=["status", "error", "updated_at"])
+        raise
+
+    retirement.status = ServiceRetirement.Status.DONE
+    retirement.finished_at = timezone.now()
+    retirement.error = ""
+    retirement.save(update_fields=["status", "finished_at", "error", "updated_at"])
+    return retirement
+
+
+def run_pending(batch_size=RETIREMENT_BATCH_SIZE):
+    """Run every pending or interrupted retirement, oldest first."""
+    done = []
+    pending = ServiceRetirement.objects.filter(
+        status__in=ServiceRetirement.ACTIVE_STATUSES,
+    ).order_by("created_at").values_list("pk", flat=True)
+    for pk in list(pending):
+        retirement = claim_retirement(pk)
+        if retirement:  # else running elsewhere or finished meanwhile
+            done.append(run_retirement(retirement, batch_size))
+    return done
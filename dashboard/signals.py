@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from bookings.models import BookingEvent
+from bookings.signals import bookings_transitioned
+from contact.models import ContactMessage
+from .live import broadcaster
+
+
+# Wake live dashboards once the change is visible to other connections
+@receiver(post_save, sender=BookingEvent)
+@receiver(post_save, sender=ContactMessage)
+def notify_live_dashboards(sender, created=False, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(broadcaster.notify)
+
+
+@receiver(bookings_transitioned)
+def notify_live_dashboards_transitioned(sender, **kwargs):
+    transaction.on_commit(broadcaster.notify)
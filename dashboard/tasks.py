@@ -0,0 +1,11 @@
+from jobs.queue import is_last_attempt, task
+from .retirement import claim_retirement, run_retirement
+
+
+@task("dashboard.retire_service", queue="maintenance")
+def retire_service(retirement_id):
+    """Finish a service retirement too large to run in the request."""
+    retirement = claim_retirement(retirement_id)
+    if retirement:  # else retire_services has run it or is running it
+        # Failed attempts stay pending until the queue stops retrying
+        run_retirement(retirement, final=is_last_attempt())
@@ -1,3 +1,108 @@
+from datetime import timedelta
+from unittest import mock
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from bookings import stats
+from bookings.models import Booking, DailyBookingStats, hour_choices
+from bookings.tests import make_booking, make_service, make_user, rollup
+from services.models import Service
+from . import retirement
+from .models import RetiredBookingLink, ServiceRetirement
 
-# Create your tests here.
+
+class RetirementTests(TestCase):
+    """Deleting a service in batches, and backing out when that fails."""
+
+    def setUp(self):
+        self.admin = make_user("admin@example.com", is_staff=True, is_superuser=True)
+        self.service = make_service()
+        self.other = make_service("Bath Only")
+        self.day = timezone.localdate() - timedelta(days=3)
+        slots = [t for (t, _label) in hour_choices(9, 13)]
+        for i, slot in enumerate(slots):
+            make_booking(
+                self.admin, self.service, self.day, slot,
+                status=Booking.Status.COMPLETED if i % 2 else Booking.Status.CANCELLED,
+            )
+        # Moved to another service; only its original link is cleared
+        moved = make_booking(self.admin, self.service, self.day + timedelta(days=1), slots[0])
+        moved.service = self.other
+        moved.status = Booking.Status.CANCELLED
+        moved.save()
+        self.service.is_active = False
+        self.service.save()
+
+    def links(self):
+        return list(Booking.objects.order_by("pk").values_list("service_id", "original_service_id"))
+
+    def retire(self, batch_size):
+        record = ServiceRetirement.objects.create(
+            service_id=self.service.pk, service_name=self.service.name, requested_by=self.admin,
+        )
+        return retirement.run_retirement(retirement.claim_retirement(record.pk), batch_size)
+
+    def test_retirement_folds_stats_into_deleted_services(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            done = retirement.start_retirement(self.service, self.admin)
+
+        self.assertEqual(done.status, ServiceRetirement.Status.DONE)
+        self.assertEqual(done.processed, 6)
+        self.assertFalse(Service.objects.filter(pk=self.service.pk).exists())
+        self.assertFalse(Booking.objects.filter(service_id=self.service.pk).exists())
+        self.assertFalse(Booking.objects.filter(original_service_id=self.service.pk).exists())
+        self.assertEqual(Booking.objects.filter(service_name_snapshot="Full Groom").count(), 6)
+        self.assertFalse(RetiredBookingLink.objects.exists())
+
+        self.assertFalse(DailyBookingStats.objects.filter(service_id=self.service.pk).exists())
+        names = [row["name"] for row in stats.summary(self.day, self.day)["per_service"]]
+        self.assertEqual(names, ["Deleted services"])
+        kept = rollup()
+        stats.rebuild()
+        self.assertEqual(kept, rollup())
+
+    def test_reactivated_service_gets_its_bookings_back(self):
+        before = self.links()
+        locks = iter(range(10))
+        lock_retirable = retirement.lock_retirable
+
+        def reactivate_after_two_batches(service_id):
+            if next(locks) == 2:
+                Service.objects.filter(pk=service_id).update(is_active=True)
+            return lock_retirable(service_id)
+
+        with mock.patch.object(retirement, "lock_retirable", reactivate_after_two_batches):
+            failed = self.retire(batch_size=2)
+
+        self.assertEqual(failed.status, ServiceRetirement.Status.FAILED)
+        self.assertEqual(failed.processed, 0)
+        self.assertEqual(self.links(), before)
+        self.assertFalse(RetiredBookingLink.objects.exists())
+        self.assertTrue(Service.objects.filter(pk=self.service.pk).exists())
+
+    def test_final_error_restores_links_and_reraises(self):
+        before = self.links()
+        detach_batch = retirement.detach_batch
+        calls = iter(range(10))
+
+        def fail_second_batch(record, batch_size):
+            if next(calls) == 1:
+                raise RuntimeError("connection lost")
+            return detach_batch(record, batch_size)
+
+        with mock.patch.object(retirement, "detach_batch", fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.retire(batch_size=2)
+
+        record = ServiceRetirement.objects.get()
+        self.assertEqual(record.status, ServiceRetirement.Status.FAILED)
+        self.assertEqual(record.error, "connection lost")
+        self.assertEqual(self.links(), before)
+
+    def test_service_cannot_be_reactivated_while_retiring(self):
+        ServiceRetirement.objects.create(service_id=self.service.pk, service_name=self.service.name)
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse("dashboard:service_toggle", args=[self.service.pk]))
+        self.assertRedirects(response, reverse("dashboard:admin_dashboard"), fetch_redirect_response=False)
+        self.service.refresh_from_db()
+        self.assertFalse(self.service.is_active)
@@ -9,6 +9,21 @@ urlpatterns = [
         views.admin_dashboard,
         name="admin_dashboard"
     ),
+    path(
+        "admin/live/",
+        views.dashboard_live,
+        name="live"
+    ),
+    path(
+        "admin/panels/stats/",
+        views.dashboard_stats,
+        name="stats"
+    ),
+    path(
+        "admin/panels/<slug:panel>/",
+        views.dashboard_panel,
+        name="panel"
+    ),
     # Services
     path(
         "admin/services/toggle/<int:pk>/",
@@ -30,6 +45,11 @@ urlpatterns = [
         views.service_delete,
         name="service_delete"
     ),
+    path(
+        "admin/services/retirements/<int:pk>/",
+        views.service_retirement_status,
+        name="service_retirement"
+    ),
     # Bookings
     path(
         "admin/bookings/complete/<int:pk>/",
@@ -41,6 +61,21 @@ urlpatterns = [
         views.booking_mark_cancelled,
         name="booking_cancel"
     ),
+    path(
+        "admin/bookings/transition/",
+        views.booking_bulk_transition,
+        name="booking_bulk_transition"
+    ),
+    path(
+        "admin/bookings/export/",
+        views.booking_export,
+        name="booking_export"
+    ),
+    path(
+        "admin/bookings/events/",
+        views.booking_events,
+        name="booking_events"
+    ),
     path(
         "admin/bookings/view/<int:pk>/",
         views.booking_view,
@@ -52,6 +87,11 @@ urlpatterns = [
         views.message_delete,
         name="message_delete"
     ),
+    path(
+        "admin/messages/<int:pk>/<slug:action>/",
+        views.message_state,
+        name="message_state"
+    ),
     path(
         "admin/messages/view/<int:pk>/",
         views.message_view,
@@ -1,15 +1,46 @@
+from asgiref.sync import sync_to_async
 from django import forms
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError
 from django.core.exceptions import ValidationError
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Count, Q
+from django.utils import timezone
+from datetime import timedelta
 from services.models import Service
+from archive import history
+from bookings import events, stats
+from bookings.export import EXPORT_FORMATS, InvalidExportFilter, export_response, filter_bookings
 from bookings.models import Booking
+from bookings.transitions import ALLOWED_TRANSITIONS, transition, transition_booking
+from contact import inbox
 from contact.models import ContactMessage
+from contact.search import search_messages
+from core.cache import aget_or_compute
+from core.pagination import InvalidCursor, akeyset_page
+from . import live
+from .models import ServiceRetirement
+from .retirement import being_retired, start_retirement
+
+# Dashboard panels (rows per page) and stats period
+DASHBOARD_PAGE_SIZE = 25
+STATS_PERIOD_DAYS = 30
+
+# The stats panel may lag the rollup by this many seconds
+STATS_FRESH_SECONDS = 30
+
+PANEL_TEMPLATES = {
+    "services": "dashboard/partials/panel_services.html",
+    "upcoming": "dashboard/partials/panel_upcoming.html",
+    "previous": "dashboard/partials/panel_previous.html",
+    "messages": "dashboard/partials/panel_messages.html",
+}
+# Messages folder served from the archive table, with its own row template
+ARCHIVE_FOLDER = "older"
+ARCHIVED_MESSAGES_TEMPLATE = "dashboard/partials/panel_archived_messages.html"
 
 
 def superuser_required(user):
@@ -20,36 +51,126 @@ def superuser_required(user):
 @login_required
 @user_passes_test(superuser_required)
 def admin_dashboard(request):
-    services = (
-        Service.objects
-        .all()
-        .annotate(
-            confirmed_count=Count(
-                'bookings',
-                filter=Q(bookings__status=Booking.Status.CONFIRMED)
+    # Shell only; each panel loads its rows from dashboard_panel on demand
+    context = {
+        "status_choices": Booking.Status.choices,
+        "breed_size_choices": Booking.BreedSize.choices,
+        "inbox_counts": inbox.counts(),
+    }
+    return render(request, "dashboard/admin.html", context)
+
+
+@login_required
+@user_passes_test(superuser_required)
+async def dashboard_live(request):
+    """
+    Server-sent events for new booking events and contact messages.
+    Streams under ASGI; under WSGI it answers once and the browser
+    reconnects after the retry delay.
+    """
+    cursor = live.decode_cursor(request.headers.get("Last-Event-ID"))
+    if cursor is None:
+        cursor = await sync_to_async(live.current_cursor)()
+    asgi = isinstance(request, ASGIRequest)
+    events = live.stream(cursor, sync_to_async(live.read_changes), once=not asgi)
+    if asgi:
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+    else:
+        # WSGI would buffer an async stream anyway, so answer in one piece
+        body = "".join([chunk async for chunk in events])
+        response = HttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def panel_page(panel, cursor=None, params=None):
+    """
+    One keyset page of a dashboard panel. The messages panel also takes
+    `folder` (inbox, unread, archived or older) and `q` (search) from params.
+    """
+    params = params or {}
+    if panel == "services":
+        page = await akeyset_page(Service.objects.all(), ("name", "id"), cursor, DASHBOARD_PAGE_SIZE)
+        counts = await stats.aconfirmed_counts([s.pk for s in page.items])
+        retirements = {
+            r.service_id: r async for r in ServiceRetirement.objects.filter(
+                service_id__in=[s.pk for s in page.items],
+                status__in=ServiceRetirement.ACTIVE_STATUSES,
             )
+        }
+        for s in page.items:
+            s.confirmed_count = counts.get(s.pk, 0)
+            s.retirement = retirements.get(s.pk)
+        return page
+    if panel == "upcoming":
+        qs = (
+            Booking.objects
+            .filter(status__in=[Booking.Status.CONFIRMED])
+            .select_related("service")
         )
-        .order_by("name")
+        return await akeyset_page(qs, ("date", "time", "id"), cursor, DASHBOARD_PAGE_SIZE)
+    if panel == "previous":
+        # Includes bookings already moved to the archive table
+        return await history.abooking_history_page(None, cursor, DASHBOARD_PAGE_SIZE)
+    folder = params.get("folder") or "inbox"
+    if folder == ARCHIVE_FOLDER:
+        qs = history.archived_messages(params.get("q"))
+        return await akeyset_page(qs, ("created_at", "id"), cursor, DASHBOARD_PAGE_SIZE, descending=True)
+    qs = ContactMessage.objects.filter(**inbox.FOLDERS.get(folder, inbox.FOLDERS["inbox"]))
+    qs = search_messages(qs, params.get("q"))
+    return await akeyset_page(qs, ("created_at", "id"), cursor, DASHBOARD_PAGE_SIZE, descending=True)
+
+
+def render_html(request, template, context):
+    return render(request, template, context).content.decode("utf-8")
+
+
+@login_required
+@user_passes_test(superuser_required)
+async def dashboard_panel(request, panel):
+    if panel not in PANEL_TEMPLATES:
+        return JsonResponse({"success": False, "error": "Unknown panel."}, status=404)
+    cursor = request.GET.get("cursor")
+    try:
+        page = await panel_page(panel, cursor, request.GET)
+    except InvalidCursor:
+        return JsonResponse({"success": False, "error": "Invalid cursor."}, status=400)
+
+    template = PANEL_TEMPLATES[panel]
+    if panel == "messages" and request.GET.get("folder") == ARCHIVE_FOLDER:
+        template = ARCHIVED_MESSAGES_TEMPLATE
+
+    # Rows are already loaded; templates render in a thread as they may
+    # touch the session
+    html = await sync_to_async(render_html)(
+        request,
+        template,
+        {"items": page.items, "first_page": not cursor},
     )
+    data = {"success": True, "html": html, "next": page.next_cursor}
+    if panel == "messages":
+        data["counts"] = await inbox.acounts()
+    return JsonResponse(data)
+
 
-    upcoming = (
-        Booking.objects
-        .filter(status__in=[Booking.Status.CONFIRMED])
-        .order_by("date", "time")
+@login_required
+@user_passes_test(superuser_required)
+async def dashboard_stats(request):
+    """Booking stats for the last STATS_PERIOD_DAYS days, from the rollup."""
+    end = timezone.localdate()
+    start = end - timedelta(days=STATS_PERIOD_DAYS - 1)
+    summary = await aget_or_compute(
+        "booking-stats", f"{start}:{end}",
+        lambda: stats.asummary(start, end),
+        soft_ttl=STATS_FRESH_SECONDS,
     )
-    previous = (
-        Booking.objects
-        .filter(status__in=[Booking.Status.CANCELLED, Booking.Status.COMPLETED])
-        .order_by("-date", "-time")
+    html = await sync_to_async(render_html)(
+        request,
+        "dashboard/partials/panel_stats.html",
+        {"summary": summary},
     )
-
-    messages_qs = ContactMessage.objects.all()
-    return render(request, "dashboard/admin.html", {
-        "services": services,
-        "upcoming": upcoming,
-        "previous": previous,
-        "messages_qs": messages_qs,
-    })
+    return JsonResponse({"success": True, "html": html, "next": None})
 
 
 # Services Views
@@ -58,8 +179,11 @@ def admin_dashboard(request):
 @require_POST
 def service_toggle_active(request, pk):
     service = get_object_or_404(Service, pk=pk)
+    if being_retired(service.pk):
+        messages.error(request, f"Service '{service.name}' is being deleted and cannot be changed.")
+        return redirect("dashboard:admin_dashboard")
     service.is_active = not service.is_active
-    service.save(update_fields=["is_active"])
+    service.save(update_fields=["is_active", "updated_at"])
     return redirect("dashboard:admin_dashboard")
 
 
@@ -114,6 +238,12 @@ class ServiceForm(forms.ModelForm):
             raise ValidationError("A service with this name already exists.")
         return name
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk and being_retired(self.instance.pk):
+            raise ValidationError("This service is being deleted and cannot be changed.")
+        return cleaned_data
+
 
 @login_required
 @user_passes_test(superuser_required)
@@ -222,22 +352,39 @@ def service_edit(request, pk):
 def service_delete(request, pk):
     service = get_object_or_404(Service, pk=pk)
 
-    # If inactive AND no confirmed bookings
-    has_confirmed = service.bookings.filter(status=Booking.Status.CONFIRMED).exists()
-    if service.is_active or has_confirmed:
-        messages.error(request, "Cannot delete: service must be inactive and have no confirmed bookings.")
+    # Only inactive services with no confirmed bookings can be retired
+    try:
+        retirement = start_retirement(service, request.user)
+    except ValidationError as exc:
+        messages.error(request, f"Cannot delete: {exc.messages[0]}")
         return redirect("dashboard:admin_dashboard")
 
-    # Ensure any linked bookings have snapshot filled
-    for b in Booking.objects.filter(Q(service=service) | Q(original_service=service), service_name_snapshot=""):
-        b.service_name_snapshot = service.name
-        b.save(update_fields=["service_name_snapshot"])
-
-    service.delete()
-    messages.success(request, f"Service '{service.name}' deleted.")
+    if retirement.status == ServiceRetirement.Status.DONE:
+        messages.success(request, f"Service '{service.name}' deleted.")
+    elif retirement.status == ServiceRetirement.Status.FAILED:
+        messages.error(request, f"Cannot delete: {retirement.error}")
+    else:
+        messages.info(
+            request,
+            f"Service '{service.name}' has {retirement.total} bookings; "
+            "it will be deleted in the background.",
+        )
     return redirect("dashboard:admin_dashboard")
 
 
+@login_required
+@user_passes_test(superuser_required)
+def service_retirement_status(request, pk):
+    retirement = get_object_or_404(ServiceRetirement, pk=pk)
+    return JsonResponse({
+        "success": True,
+        "status": retirement.status,
+        "processed": retirement.processed,
+        "total": retirement.total,
+        "percent": retirement.percent,
+    })
+
+
 # Bookings Views
 @login_required
 @user_passes_test(superuser_required)
@@ -255,10 +402,10 @@ def booking_view(request, pk):
 @require_POST
 def booking_mark_complete(request, pk):
     booking = get_object_or_404(Booking, pk=pk)
-    if booking.status != Booking.Status.COMPLETED:
-        booking.status = Booking.Status.COMPLETED
-        booking.save(update_fields=["status"])
+    if transition_booking(booking, Booking.Status.COMPLETED, actor=request.user):
         messages.success(request, "Booking marked as completed.")
+    else:
+        messages.error(request, "Only confirmed bookings can be completed.")
     return redirect("dashboard:admin_dashboard")
 
 
@@ -267,18 +414,82 @@ def booking_mark_complete(request, pk):
 @require_POST
 def booking_mark_cancelled(request, pk):
     booking = get_object_or_404(Booking, pk=pk)
-    if booking.status != Booking.Status.CANCELLED:
-        booking.status = Booking.Status.CANCELLED
-        booking.save(update_fields=["status"])
+    if transition_booking(booking, Booking.Status.CANCELLED, actor=request.user):
         messages.success(request, "Booking cancelled.")
+    else:
+        messages.error(request, "Only confirmed bookings can be cancelled.")
     return redirect("dashboard:admin_dashboard")
 
 
+@login_required
+@user_passes_test(superuser_required)
+@require_POST
+def booking_bulk_transition(request):
+    """
+    Complete or cancel every confirmed booking matching the changelist
+    filters in the POST data (e.g. a date range to close out a week).
+    """
+    to_status = request.POST.get("to_status")
+    if to_status not in ALLOWED_TRANSITIONS:
+        messages.error(request, "Choose whether to complete or cancel the bookings.")
+        return redirect("dashboard:admin_dashboard")
+    try:
+        queryset = filter_bookings(request.POST)
+    except InvalidExportFilter as exc:
+        messages.error(request, str(exc))
+        return redirect("dashboard:admin_dashboard")
+    if not (request.POST.get("date__gte") or request.POST.get("date__lt")):
+        messages.error(request, "Choose a date range for the bulk update.")
+        return redirect("dashboard:admin_dashboard")
+
+    result = transition(
+        queryset.filter(status__in=ALLOWED_TRANSITIONS[to_status]),
+        to_status,
+        actor=request.user,
+    )
+    label = Booking.Status(to_status).label.lower()
+    messages.success(request, f"{result.changed} booking(s) {label}.")
+    return redirect("dashboard:admin_dashboard")
+
+
+@login_required
+@user_passes_test(superuser_required)
+def booking_export(request):
+    """
+    Stream bookings as CSV or NDJSON. Accepts the same filter parameters
+    as the BookingAdmin changelist.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Unknown export format.")
+    try:
+        queryset = filter_bookings(request.GET)
+    except InvalidExportFilter as exc:
+        return HttpResponseBadRequest(str(exc))
+    filename = f"bookings-{timezone.localdate():%Y%m%d}"
+    return export_response(queryset, fmt, filename, request)
+
+
+@login_required
+@user_passes_test(superuser_required)
+def booking_events(request):
+    """Outbox of booking events after the id in ?after=, oldest first."""
+    try:
+        after = int(request.GET.get("after", 0))
+        limit = int(request.GET.get("limit", events.OUTBOX_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid after or limit."}, status=400)
+    items, cursor = events.read_outbox(after, limit)
+    return JsonResponse({"success": True, "events": items, "next": cursor})
+
+
 # Messages Views
 @login_required
 @user_passes_test(superuser_required)
 def message_view(request, pk):
     m = get_object_or_404(ContactMessage, pk=pk)
+    if not m.is_read:
+        m = inbox.mark_read(m.pk)
     return render(
         request,
         "dashboard/partials/message_view_inner.html",
@@ -286,6 +497,27 @@ def message_view(request, pk):
     )
 
 
+@login_required
+@user_passes_test(superuser_required)
+@require_POST
+def message_state(request, pk, action):
+    """Mark a message read/unread or move it in/out of the archive."""
+    get_object_or_404(ContactMessage, pk=pk)
+    if action == "read":
+        inbox.mark_read(pk, True)
+    elif action == "unread":
+        inbox.mark_read(pk, False)
+    elif action == "archive":
+        inbox.set_archived(pk, True)
+        messages.success(request, "Message archived.")
+    elif action == "unarchive":
+        inbox.set_archived(pk, False)
+        messages.success(request, "Message moved to the inbox.")
+    else:
+        return HttpResponseBadRequest("Unknown action.")
+    return redirect("dashboard:admin_dashboard")
+
+
 @login_required
 @user_passes_test(superuser_required)
 @require_POST
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for the web process.
+
+SERVER_MODE selects how Django is served:
+- asgi (default): uvicorn workers running config.asgi, so async views and
+  the live dashboard stream do not tie up a worker while waiting on I/O
+- wsgi: sync workers running config.wsgi; the async views then each run
+  in their own event loop via async_to_sync, which costs time per request
+"""
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "asgi").lower()
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "sync"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+accesslog = "-"
@@ -0,0 +1,35 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "queue", "status", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "queue", "name")
+    search_fields = ("name",)
+    readonly_fields = (
+        "queue", "name", "payload", "status", "run_at", "attempts", "max_attempts",
+        "locked_by", "locked_at", "last_error", "created_at", "updated_at", "finished_at",
+    )
+    actions = ("retry_jobs",)
+
+    def retry_jobs(self, request, queryset):
+        count = queryset.filter(status=Job.Status.FAILED).update(
+            status=Job.Status.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f"{count} failed job(s) queued again.")
+    retry_jobs.short_description = "Retry selected failed jobs"
+
+    # Jobs are queued by the application, not by hand
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return request.user.is_superuser
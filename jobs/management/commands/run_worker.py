@@ -0,0 +1,53 @@
+import signal
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from jobs.queue import POLL_INTERVAL, purge_finished, work, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the database queue. Runs until stopped "
+        "(SIGTERM/SIGINT finish the current job first), or with --once until "
+        "no jobs are due. Start several workers to run jobs in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue", action="append", dest="queues",
+            help="Only take jobs from this queue (repeatable), default all.",
+        )
+        parser.add_argument("--once", action="store_true", help="Exit when no jobs are due.")
+        parser.add_argument("--batch", type=int, default=1, help="Jobs claimed per queue per poll.")
+        parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Idle poll delay (seconds).")
+        parser.add_argument(
+            "--keep-days", type=int, default=7,
+            help="Delete done jobs older than this many days on start.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch"] < 1:
+            raise CommandError("--batch must be at least 1.")
+
+        purged = purge_finished(timedelta(days=options["keep_days"]))
+        if purged:
+            self.stdout.write(f"Purged {purged} finished job(s).")
+
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        name = worker_name()
+        self.stdout.write(f"Worker {name} started.")
+        ran = work(
+            queues=options["queues"],
+            worker=name,
+            once=options["once"],
+            batch=options["batch"],
+            interval=options["interval"],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Worker {name} stopped after {ran} job(s)."))
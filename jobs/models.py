@@ -0,0 +1,59 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    '''
+    A unit of background work, run by `manage.py run_worker`.
+    - name is a task registered with jobs.queue.task; payload holds its
+      keyword arguments.
+    - Due when queued and run_at has passed; failures are retried with
+      backoff until max_attempts, then left failed.
+    - locked_by/locked_at record the worker running it, so jobs of a
+      crashed worker can be released.
+    '''
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    queue = models.CharField(max_length=40, default="default")
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"#{self.pk} {self.name} [{self.queue}, {self.get_status_display()}]"
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [
+            # Claims: due jobs per queue in run_at order
+            models.Index(fields=["queue", "status", "run_at"]),
+            # Releasing jobs held by a dead worker
+            models.Index(fields=["status", "locked_at"]),
+        ]
+
+
+class JobQueue(models.Model):
+    '''
+    One row per queue, locked while claiming jobs from it.
+    - Serialises claims where a concurrency limit applies, and on SQLite,
+      which has no row locks or SKIP LOCKED.
+    '''
+    name = models.CharField(max_length=40, primary_key=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
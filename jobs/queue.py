@@ -0,0 +1,295 @@
+"""
+A small job queue stored in the main database.
+
+Claiming marks due jobs as running in one short transaction:
+- Postgres: SELECT ... FOR UPDATE SKIP LOCKED, so workers claim different
+  jobs without waiting on each other.
+- SQLite (no row locks): the queue's JobQueue row is written first, which
+  takes the database write lock and serialises claimers; the claim UPDATE
+  is still guarded on status as a compare-and-set.
+Queues with a concurrency limit (settings.JOB_QUEUE_CONCURRENCY) always
+lock their JobQueue row so the running count cannot be overshot.
+
+Jobs run outside the claim transaction. A failed job is requeued with
+exponential backoff until it has used max_attempts. While a job runs, a
+heartbeat thread refreshes its locked_at every HEARTBEAT_INTERVAL, so
+release_stale() only takes back jobs whose worker has stopped, however
+long they take. Jobs claimed in a batch wait unrefreshed behind the one
+running, so each is re-checked as still ours right before it starts.
+"""
+import contextvars
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Retry delay after the Nth failed attempt: RETRY_BASE_DELAY * 2 ** (N - 1),
+# capped at RETRY_MAX_DELAY, plus up to 10% jitter
+RETRY_BASE_DELAY = timedelta(seconds=10)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+# Running jobs refresh locked_at this often (seconds); one not refreshed
+# for STALE_AFTER belongs to a dead worker
+HEARTBEAT_INTERVAL = 60
+STALE_AFTER = timedelta(minutes=5)
+
+POLL_INTERVAL = 2  # seconds between polls when idle
+
+TASKS = {}
+
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+@dataclass
+class Task:
+    name: str
+    func: object
+    queue: str
+    max_attempts: int
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, run_at=None, **kwargs):
+        """Queue a run with these keyword arguments (JSON-serialisable)."""
+        return enqueue(
+            self.name, kwargs, queue=self.queue, run_at=run_at, max_attempts=self.max_attempts,
+        )
+
+
+def task(name, queue="default", max_attempts=5):
+    """Register a function as a background task under `name`."""
+    def register(func):
+        TASKS[name] = Task(name, func, queue, max_attempts)
+        return TASKS[name]
+    return register
+
+
+def enqueue(name, payload=None, queue="default", run_at=None, max_attempts=5):
+    """
+    Add a job. Inside a transaction it only becomes visible to workers when
+    that transaction commits.
+    """
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        queue=queue,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def current_job():
+    """The Job this worker is running, or None when called outside a job."""
+    return _current_job.get()
+
+
+def is_last_attempt():
+    """True unless the running job will be retried if it fails."""
+    job = current_job()
+    return job is None or job.attempts >= job.max_attempts
+
+
+def retry_delay(attempts):
+    # The exponent is bounded (well past the cap) so a task allowed many
+    # attempts cannot overflow timedelta
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** min(attempts - 1, 20))
+    return delay + delay * random.uniform(0, 0.1)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lock_queue(queue, now):
+    JobQueue.objects.bulk_create([JobQueue(name=queue)], ignore_conflicts=True)
+    if connections[Job.objects.db].vendor == "postgresql":
+        JobQueue.objects.select_for_update().get(name=queue)
+    else:
+        JobQueue.objects.filter(name=queue).update(claimed_at=now)
+
+
+def claim(queue, worker, limit=1):
+    """Mark up to `limit` due jobs in `queue` as running for `worker`."""
+    now = timezone.now()
+    postgres = connections[Job.objects.db].vendor == "postgresql"
+    cap = settings.JOB_QUEUE_CONCURRENCY.get(queue)
+    with transaction.atomic():
+        if cap or not postgres:
+            lock_queue(queue, now)
+        if cap:
+            running = Job.objects.filter(queue=queue, status=Job.Status.RUNNING).count()
+            limit = min(limit, cap - running)
+            if limit <= 0:
+                return []
+
+        due = Job.objects.filter(
+            queue=queue, status=Job.Status.QUEUED, run_at__lte=now,
+        ).order_by("run_at", "id")
+        if postgres:
+            due = due.select_for_update(skip_locked=True)
+        pks = list(due.values_list("pk", flat=True)[:limit])
+        if not pks:
+            return []
+        Job.objects.filter(pk__in=pks, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        return list(Job.objects.filter(pk__in=pks, status=Job.Status.RUNNING, locked_by=worker))
+
+
+def finish(job, **fields):
+    """Record a job's outcome unless another worker has taken it over."""
+    fields.setdefault("locked_by", "")
+    fields.setdefault("locked_at", None)
+    return Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by,
+    ).update(updated_at=timezone.now(), **fields)
+
+
+class Heartbeat(threading.Thread):
+    """Refreshes a running job's locked_at until stopped."""
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        super().__init__(name=f"job-heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        pk=self.job.pk, status=Job.Status.RUNNING, locked_by=self.job.locked_by,
+                    ).update(locked_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Heartbeat for job %s failed", self.job, exc_info=True)
+        finally:
+            # This thread's own connection
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def confirm_claim(job):
+    """
+    Refresh a claimed job's locked_at just before it runs. False when it was
+    released as stale (or taken by another worker) while waiting behind the
+    other jobs of its batch.
+    """
+    return Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by,
+    ).update(locked_at=timezone.now()) == 1
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome. Returns True on success, or
+    None when the job is no longer ours to run.
+    """
+    if not confirm_claim(job):
+        logger.warning("Job %s was released before it started; skipping", job)
+        return None
+    registered = TASKS.get(job.name)
+    token = _current_job.set(job)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        if registered is None:
+            raise LookupError(f"No task registered as {job.name!r}.")
+        registered.func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s failed for good:\n%s", job, error)
+            finish(job, status=Job.Status.FAILED, last_error=error, finished_at=now)
+        else:
+            logger.warning("Job %s failed, retrying:\n%s", job, error)
+            finish(
+                job,
+                status=Job.Status.QUEUED,
+                last_error=error,
+                run_at=now + retry_delay(job.attempts),
+            )
+        return False
+    finally:
+        heartbeat.stop()
+        _current_job.reset(token)
+    finish(job, status=Job.Status.DONE, last_error="", finished_at=timezone.now())
+    return True
+
+
+def release_stale(now=None):
+    """Requeue (or fail) jobs left running by a worker that went away."""
+    now = now or timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - STALE_AFTER)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, locked_by="", locked_at=None,
+        last_error="Worker stopped before finishing.", finished_at=now, updated_at=now,
+    )
+    requeued = stale.update(
+        status=Job.Status.QUEUED, locked_by="", locked_at=None, run_at=now, updated_at=now,
+    )
+    return requeued + failed
+
+
+def purge_finished(older_than, now=None):
+    """Delete done jobs finished more than `older_than` ago."""
+    now = now or timezone.now()
+    deleted, _ = Job.objects.filter(
+        status=Job.Status.DONE, finished_at__lt=now - older_than,
+    ).delete()
+    return deleted
+
+
+def due_queues():
+    return list(
+        Job.objects
+        .filter(status=Job.Status.QUEUED, run_at__lte=timezone.now())
+        .order_by()
+        .values_list("queue", flat=True)
+        .distinct()
+    )
+
+
+def work(queues=None, worker=None, once=False, batch=1, interval=POLL_INTERVAL, should_stop=None):
+    """
+    Claim and run jobs until stopped (or, with once, until none are due).
+    Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    should_stop = should_stop or (lambda: False)
+    total = 0
+    while not should_stop():
+        close_old_connections()
+        release_stale()
+        ran = 0
+        for queue in queues or due_queues():
+            for job in claim(queue, worker, batch):
+                if run_job(job) is not None:
+                    ran += 1
+        total += ran
+        if not ran:
+            if once:
+                break
+            time.sleep(interval)
+    return total
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from . import queue
+from .models import Job
+
+
+class RetryTests(TestCase):
+    """Failed jobs come back with a growing delay until their last attempt."""
+
+    def setUp(self):
+        self.calls = []
+        self.fail = True
+
+        def flaky(**payload):
+            self.calls.append(payload)
+            if self.fail:
+                raise RuntimeError("not yet")
+
+        queue.task("tests.flaky", queue="tests", max_attempts=3)(flaky)
+        self.addCleanup(queue.TASKS.pop, "tests.flaky")
+
+    def claim_and_run(self):
+        [job] = queue.claim("tests", "worker-1")
+        with self.assertLogs("jobs.queue", "WARNING"):
+            outcome = queue.run_job(job)
+        job.refresh_from_db()
+        return outcome, job
+
+    def make_due(self, job):
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+
+    def test_failures_are_retried_with_backoff_then_fail(self):
+        queue.TASKS["tests.flaky"].enqueue(booking=7)
+
+        delays = []
+        for attempt in (1, 2):
+            started = timezone.now()
+            outcome, job = self.claim_and_run()
+            self.assertIs(outcome, False)
+            self.assertEqual(job.status, Job.Status.QUEUED)
+            self.assertEqual(job.attempts, attempt)
+            self.assertIn("not yet", job.last_error)
+            self.assertEqual(job.locked_by, "")
+            delays.append(job.run_at - started)
+            # Not claimable before its retry is due
+            self.assertEqual(queue.claim("tests", "worker-1"), [])
+            self.make_due(job)
+
+        self.assertGreaterEqual(delays[0], queue.RETRY_BASE_DELAY)
+        self.assertGreaterEqual(delays[1], 2 * queue.RETRY_BASE_DELAY)
+        self.assertGreater(delays[1], delays[0])
+
+        outcome, job = self.claim_and_run()
+        self.assertIs(outcome, False)
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.calls, [{"booking": 7}] * 3)
+
+    def test_retry_succeeds(self):
+        job = queue.TASKS["tests.flaky"].enqueue()
+        self.claim_and_run()
+        self.make_due(job)
+        self.fail = False
+
+        [job] = queue.claim("tests", "worker-1")
+        self.assertIs(queue.run_job(job), True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.last_error, "")
+
+    def test_retry_delay_is_capped(self):
+        self.assertLessEqual(queue.retry_delay(50), queue.RETRY_MAX_DELAY * 1.1)
+        self.assertLess(queue.retry_delay(1), queue.retry_delay(3))
+
+    def test_released_job_is_not_run(self):
+        queue.TASKS["tests.flaky"].enqueue()
+        [job] = queue.claim("tests", "worker-1")
+        # Released as stale while it waited behind the rest of its batch
+        queue.release_stale(now=timezone.now() + queue.STALE_AFTER + timedelta(seconds=1))
+
+        with self.assertLogs("jobs.queue", "WARNING"):
+            self.assertIsNone(queue.run_job(job))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.Status.QUEUED)
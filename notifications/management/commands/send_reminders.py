@@ -0,0 +1,38 @@
+import signal
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from notifications.reminders import REMINDER_BATCH_SIZE, run_tick
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue appointment reminders that are due (24h and 2h before each "
+        "confirmed booking). Runs one pass, or with --loop a pass every "
+        "--interval seconds. Safe to run on several machines at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running until stopped.")
+        parser.add_argument("--interval", type=float, default=60, help="Seconds between passes.")
+        parser.add_argument("--batch-size", type=int, default=REMINDER_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if not options["loop"]:
+            queued = run_tick(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{queued} reminder(s) queued."))
+            return
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+        while not stopping:
+            close_old_connections()
+            queued = run_tick(batch_size=options["batch_size"])
+            if queued:
+                self.stdout.write(f"{queued} reminder(s) queued.")
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Reminder scheduler stopped."))
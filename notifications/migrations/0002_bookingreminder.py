@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_archivedbooking'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookingnotification',
+            name='kind',
+            field=models.CharField(choices=[('confirmed', 'Booking confirmed'), ('changed', 'Booking changed'), ('cancelled', 'Booking cancelled'), ('reminder', 'Appointment reminder')], max_length=10),
+        ),
+        migrations.CreateModel(
+            name='BookingReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lead_minutes', models.PositiveIntegerField()),
+                ('starts_at', models.DateTimeField()),
+                ('token', models.CharField(db_index=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('booking', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='reminders', to='bookings.booking')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('booking', 'lead_minutes', 'starts_at'), name='uniq_booking_reminder')],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import models
+from bookings.models import Booking
+
+
+class BookingNotification(models.Model):
+    '''
+    An email to a customer about their booking, waiting for the sender.
+    - Written in the same transaction as the booking change, so rolled back
+      changes never email anyone; the sender job is queued on commit.
+    - Rendered and delivered in batches by notifications.sender.
+    - booking is kept without a database constraint so a row for a deleted
+      booking is simply skipped.
+    '''
+    class Kind(models.TextChoices):
+        CONFIRMED = "confirmed", "Booking confirmed"
+        CHANGED = "changed", "Booking changed"
+        CANCELLED = "cancelled", "Booking cancelled"
+        REMINDER = "reminder", "Appointment reminder"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+        SKIPPED = "skipped", "Skipped"
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="notifications",
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - booking {self.booking_id} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+
+class BookingReminder(models.Model):
+    '''
+    Marker for a reminder queued for a booking, so each one goes out once.
+    - Unique per booking, lead time and start time: a rescheduled booking
+      is reminded again for its new slot.
+    - Inserted with a per-run token; the rows carrying a run's token are
+      the ones that run claimed, however many schedulers race.
+    - Only needed until the slot starts; old markers are purged by
+      notifications.reminders.
+    '''
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="reminders",
+    )
+    lead_minutes = models.PositiveIntegerField()
+    starts_at = models.DateTimeField()
+    token = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Booking {self.booking_id} - {self.lead_minutes} min before {self.starts_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("booking", "lead_minutes", "starts_at"),
+                name="uniq_booking_reminder",
+            )
+        ]
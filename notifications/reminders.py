@@ -0,0 +1,119 @@
+"""
+Appointment reminders, REMINDER_LEADS before each confirmed booking.
+
+Each booking is due the reminder for the shortest lead that covers its
+remaining time, unless it was booked after that reminder would have gone
+out (its confirmation email covers it). A tick therefore reads, for each
+lead, the confirmed bookings starting between the next shorter lead and
+this one: a range query on the (status, starts_at) index in keyset
+batches of REMINDER_BATCH_SIZE, skipping bookings that already have this
+lead's marker, so a quiet tick writes nothing.
+
+Due reminders are claimed by inserting BookingReminder markers; only the
+markers this tick inserted are turned into notifications, so ticks can be
+repeated, restarted or run by several workers without double sends.
+"""
+import uuid
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from bookings.models import Booking
+from core.pagination import keyset_filter
+from .models import BookingNotification, BookingReminder
+from .tasks import notify
+
+REMINDER_LEADS = (timedelta(hours=24), timedelta(hours=2))
+REMINDER_BATCH_SIZE = 200
+REMINDER_KEYS = ("starts_at", "id")
+
+# Markers are only needed until the slot has started
+MARKER_RETENTION = timedelta(days=2)
+
+
+def due_lead(starts_at, created_at, now):
+    """The lead of the reminder a booking is due now, or None."""
+    for lead in sorted(REMINDER_LEADS):
+        if starts_at - lead <= now:
+            return lead if created_at < starts_at - lead else None
+    return None
+
+
+def lead_minutes(lead):
+    return int(lead.total_seconds() // 60)
+
+
+def claim_reminders(due):
+    """
+    Insert markers for (booking_id, starts_at, lead) and queue a reminder
+    for each marker this call inserted. Returns how many were queued.
+    """
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        BookingReminder.objects.bulk_create(
+            [
+                BookingReminder(
+                    booking_id=pk,
+                    starts_at=starts_at,
+                    lead_minutes=lead_minutes(lead),
+                    token=token,
+                )
+                for pk, starts_at, lead in due
+            ],
+            ignore_conflicts=True,
+        )
+        claimed = list(BookingReminder.objects.filter(token=token).values_list("booking_id", flat=True))
+        if claimed:
+            notify(claimed, BookingNotification.Kind.REMINDER)
+    return len(claimed)
+
+
+def queue_window(lower, upper, lead, now, batch_size):
+    """Queue the `lead` reminders for bookings starting in (lower, upper]."""
+    reminded = BookingReminder.objects.filter(
+        booking_id=OuterRef("pk"),
+        starts_at=OuterRef("starts_at"),
+        lead_minutes=lead_minutes(lead),
+    )
+    window = Booking.objects.filter(
+        ~Exists(reminded),
+        status=Booking.Status.CONFIRMED,
+        starts_at__gt=lower,
+        starts_at__lte=upper,
+    ).order_by(*REMINDER_KEYS)
+
+    queued = 0
+    cursor = None
+    while True:
+        page = window
+        if cursor:
+            page = page.filter(keyset_filter(REMINDER_KEYS, cursor))
+        rows = list(page.values_list("starts_at", "id", "created_at")[:batch_size])
+        if not rows:
+            break
+        due = [
+            (pk, starts_at, lead)
+            for starts_at, pk, created_at in rows
+            if due_lead(starts_at, created_at, now) == lead
+        ]
+        if due:
+            queued += claim_reminders(due)
+        if len(rows) < batch_size:
+            break
+        cursor = rows[-1][:2]
+    return queued
+
+
+def run_tick(now=None, batch_size=REMINDER_BATCH_SIZE):
+    """Queue every reminder due at `now`. Returns how many were queued."""
+    now = now or timezone.now()
+    queued = 0
+    lower = now
+    for lead in sorted(REMINDER_LEADS):
+        queued += queue_window(lower, now + lead, lead, now, batch_size)
+        lower = now + lead
+
+    expired = BookingReminder.objects.filter(created_at__lt=now - MARKER_RETENTION)
+    if expired.exists():
+        expired.delete()
+    return queued
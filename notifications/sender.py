@@ -0,0 +1,146 @@
+"""
+Delivery of queued booking notifications.
+
+Pending rows are read in id order in batches of EMAIL_BATCH_SIZE and sent
+over one email connection for the whole run, so an SMTP backend logs in
+once rather than once per message. The service part of each email is
+rendered once per service per run and reused.
+
+Messages a server refuses (or that fail to render) are retried on later
+runs (queued with backoff by the send task) up to MAX_ATTEMPTS;
+a lost connection stops the run (after saving progress) and the job queue
+retries it with backoff.
+"""
+import smtplib
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from bookings.models import Booking
+from .models import BookingNotification
+
+EMAIL_BATCH_SIZE = 100
+MAX_ATTEMPTS = 3
+
+SUBJECTS = {
+    BookingNotification.Kind.CONFIRMED: "Your Tidy Tails booking is confirmed",
+    BookingNotification.Kind.CHANGED: "Your Tidy Tails booking has changed",
+    BookingNotification.Kind.CANCELLED: "Your Tidy Tails booking is cancelled",
+    BookingNotification.Kind.REMINDER: "Reminder: your Tidy Tails appointment",
+}
+
+# Errors about one message rather than the connection
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPResponseException,
+    smtplib.SMTPNotSupportedError,
+    ValueError,
+)
+
+
+def service_summary(booking, summaries):
+    """The rendered service section, cached in `summaries` per service."""
+    key = booking.service_id or booking.get_service_display_name()
+    if key not in summaries:
+        summaries[key] = render_to_string(
+            "notifications/email/service_summary.txt",
+            {"service": booking.service, "name": booking.get_service_display_name()},
+        )
+    return summaries[key]
+
+
+def build_message(notification, booking, summaries, connection):
+    body = render_to_string(
+        f"notifications/email/booking_{notification.kind}.txt",
+        {
+            "booking": booking,
+            "user": booking.user,
+            "service_summary": service_summary(booking, summaries),
+        },
+    )
+    return EmailMessage(
+        subject=SUBJECTS[notification.kind],
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.user.email],
+        connection=connection,
+    )
+
+
+def record_failure(notification, error):
+    notification.last_error = str(error) or error.__class__.__name__
+    if notification.attempts >= MAX_ATTEMPTS:
+        notification.status = BookingNotification.Status.FAILED
+
+
+def deliver(notification, booking, summaries, connection, now):
+    """Send one notification and set its outcome on the instance."""
+    if booking is None:
+        notification.status = BookingNotification.Status.SKIPPED
+        notification.last_error = "Booking no longer exists."
+        return
+    if notification.kind == BookingNotification.Kind.REMINDER and (
+        booking.status != Booking.Status.CONFIRMED or booking.starts_at <= now
+    ):
+        notification.status = BookingNotification.Status.SKIPPED
+        notification.last_error = "Booking is no longer upcoming."
+        return
+    if notification.attempts >= MAX_ATTEMPTS:
+        # Earlier runs stopped on this message without an outcome
+        notification.status = BookingNotification.Status.FAILED
+        return
+    notification.attempts += 1
+    try:
+        message = build_message(notification, booking, summaries, connection)
+    except Exception as exc:
+        # e.g. a template error; it would fail the same way on every run
+        record_failure(notification, exc)
+        return
+    try:
+        message.send()
+    except MESSAGE_ERRORS as exc:
+        record_failure(notification, exc)
+        return
+    except Exception as exc:
+        # Most likely the connection: the run stops, but the attempt counts
+        record_failure(notification, exc)
+        raise
+    notification.status = BookingNotification.Status.SENT
+    notification.sent_at = now
+    notification.last_error = ""
+
+
+def send_pending(batch_size=EMAIL_BATCH_SIZE, connection=None):
+    """Deliver every pending notification. Returns the number sent."""
+    sent = 0
+    after = 0
+    summaries = {}
+    connection = connection or get_connection()
+    with connection:
+        while True:
+            batch = list(
+                BookingNotification.objects
+                .filter(status=BookingNotification.Status.PENDING, pk__gt=after)
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            after = batch[-1].pk
+            bookings = (
+                Booking.objects
+                .select_related("user", "service")
+                .in_bulk({n.booking_id for n in batch})
+            )
+            now = timezone.now()
+            done = []
+            try:
+                for notification in batch:
+                    # Saved even when deliver() raises, so its attempt counts
+                    done.append(notification)
+                    deliver(notification, bookings.get(notification.booking_id), summaries, connection, now)
+            finally:
+                BookingNotification.objects.bulk_update(
+                    done, ["status", "attempts", "last_error", "sent_at"],
+                )
+            sent += sum(1 for n in done if n.status == BookingNotification.Status.SENT)
+    return sent
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from bookings.models import Booking, BookingEvent
+from bookings.signals import bookings_transitioned
+from .models import BookingNotification
+from .tasks import notify
+
+# Edits that change what the customer booked
+NOTIFY_CHANGES = {"date", "time", "service_id", "breed_size"}
+
+
+def notification_kind(event):
+    """The email a booking event calls for, if any."""
+    if event.kind == BookingEvent.Kind.CREATED:
+        return BookingNotification.Kind.CONFIRMED
+    if event.kind == BookingEvent.Kind.STATUS_CHANGED and event.to_status == Booking.Status.CANCELLED:
+        return BookingNotification.Kind.CANCELLED
+    if event.kind == BookingEvent.Kind.UPDATED and NOTIFY_CHANGES.intersection(event.payload.get("changes", {})):
+        return BookingNotification.Kind.CHANGED
+    return None
+
+
+@receiver(post_save, sender=BookingEvent)
+def booking_event_saved(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    kind = notification_kind(instance)
+    if kind:
+        notify([instance.booking_id], kind)
+
+
+@receiver(bookings_transitioned)
+def bookings_transitioned_notify(sender, pks, to_status, **kwargs):
+    if to_status == Booking.Status.CANCELLED:
+        notify(pks, BookingNotification.Kind.CANCELLED)
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import task
+from .models import BookingNotification
+from .sender import send_pending
+
+# Changes committed within this window go out in the same batch
+EMAIL_BATCH_DELAY = timedelta(seconds=5)
+
+# Delay before retrying messages a server refused: EMAIL_RETRY_DELAY *
+# 2 ** (attempts - 1), for the least-tried message still pending
+EMAIL_RETRY_DELAY = timedelta(minutes=1)
+
+
+@task("notifications.send_pending", queue="email")
+def send_notifications():
+    send_pending()
+    # Refused messages stay pending; queue their retry rather than waiting
+    # for the next booking change to start a run
+    attempts = (
+        BookingNotification.objects
+        .filter(status=BookingNotification.Status.PENDING, attempts__gt=0)
+        .aggregate(least=Min("attempts"))["least"]
+    )
+    if attempts:
+        schedule_send(EMAIL_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def schedule_send(delay=EMAIL_BATCH_DELAY):
+    """Queue a sender run in `delay` unless one is already waiting."""
+    waiting = Job.objects.filter(name=send_notifications.name, status=Job.Status.QUEUED)
+    if not waiting.exists():
+        send_notifications.enqueue(run_at=timezone.now() + delay)
+
+
+def notify(booking_ids, kind):
+    """
+    Queue a notification of this kind for each booking. The rows commit
+    with the caller's transaction; the sender is queued after commit.
+    """
+    BookingNotification.objects.bulk_create(
+        [BookingNotification(booking_id=pk, kind=kind) for pk in booking_ids]
+    )
+    transaction.on_commit(schedule_send)
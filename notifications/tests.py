@@ -0,0 +1,54 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from bookings.models import Booking, hour_choices
+from bookings.tests import make_booking, make_service, make_user
+from .models import BookingNotification, BookingReminder
+from .reminders import run_tick
+
+
+class ReminderTests(TestCase):
+    """Each reminder is queued once, however often the tick runs."""
+
+    def setUp(self):
+        # Soon enough that ticks stay within MARKER_RETENTION of real time
+        day = timezone.localdate() + timedelta(days=1)
+        self.booking = make_booking(make_user(), make_service(), day, hour_choices(10, 10)[0][0])
+        # Booked well before either reminder was due
+        Booking.objects.filter(pk=self.booking.pk).update(created_at=self.booking.starts_at - timedelta(days=7))
+        self.starts_at = self.booking.starts_at
+
+    def reminders(self):
+        return BookingNotification.objects.filter(
+            booking=self.booking, kind=BookingNotification.Kind.REMINDER,
+        ).count()
+
+    def test_repeated_ticks_queue_one_reminder_per_lead(self):
+        day_before = self.starts_at - timedelta(hours=20)
+        self.assertEqual(run_tick(day_before), 1)
+        self.assertEqual(run_tick(day_before), 0)
+        self.assertEqual(run_tick(day_before + timedelta(minutes=5)), 0)
+        self.assertEqual(self.reminders(), 1)
+
+        hours_before = self.starts_at - timedelta(minutes=90)
+        self.assertEqual(run_tick(hours_before), 1)
+        self.assertEqual(run_tick(hours_before), 0)
+        self.assertEqual(self.reminders(), 2)
+        self.assertEqual(BookingReminder.objects.filter(booking=self.booking).count(), 2)
+
+    def test_late_booking_skips_the_longer_lead(self):
+        Booking.objects.filter(pk=self.booking.pk).update(created_at=self.starts_at - timedelta(hours=12))
+        self.assertEqual(run_tick(self.starts_at - timedelta(hours=10)), 0)
+        self.assertEqual(run_tick(self.starts_at - timedelta(hours=1)), 1)
+        self.assertEqual(self.reminders(), 1)
+
+    def test_rescheduled_booking_is_reminded_again(self):
+        self.assertEqual(run_tick(self.starts_at - timedelta(hours=1)), 1)
+        self.booking.date += timedelta(days=1)
+        self.booking.save()
+        self.assertEqual(run_tick(self.booking.starts_at - timedelta(hours=1)), 1)
+        self.assertEqual(self.reminders(), 2)
+
+    def test_cancelled_booking_is_not_reminded(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status=Booking.Status.CANCELLED)
+        self.assertEqual(run_tick(self.starts_at - timedelta(hours=1)), 0)
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+def backfill_includes_items(apps, schema_editor):
+    Service = apps.get_model("services", "Service")
+    services = list(Service.objects.only("pk", "includes"))
+    for service in services:
+        service.includes_items = [
+            line.strip() for line in service.includes.splitlines() if line.strip()
+        ]
+    Service.objects.bulk_update(services, ["includes_items"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='includes_items',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(backfill_includes_items, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,8 @@ class Service(models.Model):
     includes = models.TextField(
         help_text="Enter one item per line."
     )
+    # Cleaned "includes" lines, kept in sync on save
+    includes_items = models.JSONField(default=list, blank=True, editable=False)
 
     # Pricing
     price_small = models.DecimalField(
@@ -43,9 +45,26 @@ class Service(models.Model):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def parse_includes(text):
+        """Non-empty, stripped lines of an 'includes' text."""
+        return [line.strip() for line in (text or "").splitlines() if line.strip()]
+
+    def save(self, *args, **kwargs):
+        self.includes_items = self.parse_includes(self.includes)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "includes" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"includes_items"}
+        super().save(*args, **kwargs)
+
     @property
     def includes_list(self):
         """
-        Convenience for templates: returns a cleaned list of 'includes' lines.
+        Convenience for templates: the cleaned list of 'includes' lines,
+        parsed when the service was saved.
         """
-        return [line.strip() for line in self.includes.splitlines() if line.strip()]
+        return self.includes_items
+
+    def price_for(self, breed_size):
+        """Price for a breed size ("small", "medium" or "large")."""
+        return getattr(self, f"price_{breed_size}", None)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.pagecache import invalidate
+from .models import Service
+
+
+# Cached anonymous pages show the catalogue, so any change drops them
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_changed(sender, raw=False, **kwargs):
+    if not raw:
+        # After commit, so a concurrent request cannot re-cache old rows
+        transaction.on_commit(invalidate)
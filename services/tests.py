@@ -1,3 +1,33 @@
 from django.test import TestCase
+from django.urls import reverse
+from bookings.tests import make_service
 
-# Create your tests here.
+
+class CatalogueTests(TestCase):
+    """The public services page and its cache validators."""
+
+    def setUp(self):
+        self.service = make_service()
+        make_service("Retired Trim", is_active=False)
+        self.url = reverse("services:services_list")
+
+    def test_only_active_services_are_listed(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "Full Groom")
+        self.assertNotContains(response, "Retired Trim")
+
+    def test_unchanged_catalogue_revalidates(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_saved_service_changes_the_page(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = "Deluxe Groom"
+            self.service.save()
+
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Deluxe Groom")
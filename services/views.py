@@ -1,7 +1,63 @@
+import hashlib
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, Q
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from core.pagecache import anonymous_page_cache
 from .models import Service
 
+# Seconds browsers and shared caches may reuse the anonymous catalogue
+CATALOGUE_MAX_AGE = 60
 
-def services_list(request):
-    services = Service.objects.filter(is_active=True).order_by('price_small')
-    return render(request, "services/services.html", {"services": services})
+
+async def catalogue_validators(user):
+    """
+    (etag, last_modified) for the catalogue as seen by `user`.
+    The page changes when any service is saved, added or removed, and the
+    header differs per signed-in user, so that state is part of the ETag.
+    Last-Modified is only given to anonymous visitors, as it cannot
+    express a change of viewer.
+    """
+    state = await Service.objects.aaggregate(
+        last=Max("updated_at"),
+        active=Count("id", filter=Q(is_active=True)),
+    )
+    viewer = f"user:{user.pk}:{int(user.is_superuser)}" if user.is_authenticated else "anonymous"
+    raw = f"{state['last']}|{state['active']}|{viewer}"
+    etag = '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+    last_modified = None
+    if state["last"] and not user.is_authenticated:
+        last_modified = int(state["last"].timestamp())
+    return etag, last_modified
+
+
+def patch_catalogue_headers(response, etag, last_modified, public):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    if public:
+        patch_cache_control(response, public=True, max_age=CATALOGUE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+@anonymous_page_cache
+async def services_list(request):
+    user = await request.auser()
+    etag, last_modified = await catalogue_validators(user)
+    public = not user.is_authenticated
+
+    # Answer revalidations before querying or rendering the catalogue
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return patch_catalogue_headers(not_modified, etag, last_modified, public)
+
+    services = [
+        s async for s in Service.objects.filter(is_active=True).order_by('price_small')
+    ]
+    # Context processors read the session and user synchronously
+    response = await sync_to_async(render)(request, "services/services.html", {"services": services})
+    return patch_catalogue_headers(response, etag, last_modified, public)
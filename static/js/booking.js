@@ -3,16 +3,81 @@
     if (!form) return;
 
     const dateInput = form.querySelector('input[name="date"]');
-    if (!dateInput) return;
+    const timeSelect = form.querySelector('select[name="time"]');
+    const emptyHint = document.getElementById('time-empty-hint');
+    const availabilityUrl = form.getAttribute('data-availability-url');
+    if (!dateInput || !timeSelect || !availabilityUrl) return;
+
+    // Free slots by ISO date, filled a month at a time
+    const slotsByDate = {};
+    const RANGE_DAYS = 35;
+
+    function loadRange(start) {
+        const url = new URL(availabilityUrl, window.location.origin);
+        url.searchParams.set('start', start);
+        url.searchParams.set('days', RANGE_DAYS);
+        return fetch(url, { credentials: 'same-origin' })
+            .then(resp => {
+                if (!resp.ok) throw new Error('Failed to load availability');
+                return resp.json();
+            })
+            .then(data => { Object.assign(slotsByDate, data.slots); });
+    }
+
+    function renderTimes(date) {
+        const slots = slotsByDate[date] || [];
+        const current = timeSelect.value;
+        timeSelect.innerHTML = '';
+        slots.forEach(function (slot) {
+            const option = document.createElement('option');
+            option.value = slot[0];
+            option.textContent = slot[1];
+            if (slot[0] === current) option.selected = true;
+            timeSelect.appendChild(option);
+        });
+        if (emptyHint) emptyHint.hidden = slots.length > 0;
+    }
+
+    function showDate(date, time) {
+        if (date in slotsByDate) {
+            renderTimes(date);
+            if (time) timeSelect.value = time;
+            return;
+        }
+        loadRange(date)
+            .then(() => {
+                renderTimes(date);
+                if (time) timeSelect.value = time;
+            })
+            .catch(() => {
+                // Fall back to a full page load for this date
+                const url = new URL(window.location);
+                url.searchParams.set('date', date);
+                window.location.replace(url.toString());
+            });
+    }
 
     dateInput.addEventListener('change', function () {
-        // Update only the 'date' query param and trigger a clean reload
+        // Keep the 'date' query param in sync without reloading
         const url = new URL(window.location);
         if (dateInput.value) {
             url.searchParams.set('date', dateInput.value);
+            showDate(dateInput.value);
         } else {
             url.searchParams.delete('date');
         }
-        window.location.replace(url.toString());
+        window.history.replaceState(null, '', url.toString());
+    });
+
+    // Suggested slots fill in the form instead of reloading the page
+    document.querySelectorAll('[data-slot-date]').forEach(function (link) {
+        link.addEventListener('click', function (event) {
+            event.preventDefault();
+            dateInput.value = link.getAttribute('data-slot-date');
+            showDate(dateInput.value, link.getAttribute('data-slot-time'));
+        });
     });
+
+    // Prefetch the month ahead so the first date change needs no round trip
+    loadRange(dateInput.value || dateInput.getAttribute('min') || '').catch(() => {});
 })();
@@ -0,0 +1,22 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Cached pages render CSRF fields empty; fetch a token for this visitor
+    var fields = document.querySelectorAll('input[data-csrf-fill]');
+    if (!fields.length) return;
+
+    var tokenRequest = fetch(fields[0].getAttribute('data-csrf-fill'), { credentials: 'same-origin' })
+        .then(resp => resp.json())
+        .then(data => {
+            fields.forEach(function (field) { field.value = data.token; });
+        });
+
+    // Hold a submit that happens before the token has arrived
+    fields.forEach(function (field) {
+        var form = field.form;
+        if (!form) return;
+        form.addEventListener('submit', function (event) {
+            if (field.value) return;
+            event.preventDefault();
+            tokenRequest.then(function () { form.submit(); });
+        });
+    });
+});
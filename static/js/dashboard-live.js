@@ -0,0 +1,39 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Live dashboard: reload the affected panels when bookings or messages change
+    var root = document.querySelector('[data-live-url]');
+    if (!root || !window.EventSource) return;
+
+    var status = document.getElementById('live-status');
+    var pending = new Set();
+    var timer = null;
+
+    var PANELS = {
+        booking: ['#panel-upcoming', '#panel-previous', '#panel-services', '#panel-stats'],
+        message: ['#panel-messages']
+    };
+
+    // Bursts of events (e.g. a bulk transition) cause one reload per panel
+    function schedule(selectors) {
+        selectors.forEach(function (selector) { pending.add(selector); });
+        if (timer) return;
+        timer = setTimeout(function () {
+            pending.forEach(function (selector) {
+                var panel = document.querySelector(selector);
+                if (panel && window.dashboardPanels) window.dashboardPanels.reload(panel);
+            });
+            pending.clear();
+            timer = null;
+        }, 500);
+    }
+
+    var source = new EventSource(root.getAttribute('data-live-url'));
+    source.addEventListener('ready', function () {
+        if (status) status.classList.remove('d-none', 'bg-secondary');
+        if (status) status.classList.add('bg-success');
+    });
+    source.addEventListener('booking', function () { schedule(PANELS.booking); });
+    source.addEventListener('message', function () { schedule(PANELS.message); });
+    source.addEventListener('error', function () {
+        if (status) status.classList.replace('bg-success', 'bg-secondary');
+    });
+});
@@ -0,0 +1,51 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Dashboard panels load their first page when their section is opened
+    function loadPanel(container) {
+        if (container.getAttribute('data-panel-loaded')) return;
+        container.setAttribute('data-panel-loaded', 'true');
+
+        fetch(container.getAttribute('data-panel-url'), { credentials: 'same-origin' })
+            .then(resp => resp.json())
+            .then(data => {
+                if (!data.success) throw new Error(data.error || 'Failed to load');
+                container.innerHTML = data.html;
+                container.dispatchEvent(new CustomEvent('panel:loaded', { detail: data }));
+                if (data.next) {
+                    var url = new URL(container.getAttribute('data-panel-url'), window.location.origin);
+                    url.searchParams.set('cursor', data.next);
+
+                    // Hand further pages to load-more.js
+                    var btn = document.createElement('button');
+                    btn.type = 'button';
+                    btn.className = 'btn btn-sm btn-outline-secondary mt-2';
+                    btn.textContent = 'Load more';
+                    btn.setAttribute('data-load-more-url', url.pathname + url.search);
+                    btn.setAttribute('data-load-more-target', '#' + container.id);
+                    container.after(btn);
+                }
+            })
+            .catch(() => {
+                container.removeAttribute('data-panel-loaded');
+                container.innerHTML = '<li class="list-group-item text-danger">Failed to load.</li>';
+            });
+    }
+
+    // Reload a panel that is already showing, e.g. after a live update
+    function reloadPanel(container) {
+        if (!container.getAttribute('data-panel-loaded')) return;
+        var next = container.nextElementSibling;
+        if (next && next.hasAttribute('data-load-more-url')) next.remove();
+        container.removeAttribute('data-panel-loaded');
+        loadPanel(container);
+    }
+    window.dashboardPanels = { reload: reloadPanel };
+
+    document.querySelectorAll('[data-panel-url]').forEach(function (container) {
+        var section = container.closest('.accordion-collapse');
+        if (!section || section.classList.contains('show')) {
+            loadPanel(container);
+        } else {
+            section.addEventListener('show.bs.collapse', function () { loadPanel(container); });
+        }
+    });
+});
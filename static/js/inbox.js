@@ -0,0 +1,37 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Dashboard inbox: folder/search filter and counters
+    var panel = document.getElementById('panel-messages');
+    var form = document.getElementById('inbox-filter');
+    if (!panel || !form) return;
+
+    var baseUrl = panel.getAttribute('data-panel-url');
+
+    form.addEventListener('submit', function (event) {
+        event.preventDefault();
+        var url = new URL(baseUrl, window.location.origin);
+        new FormData(form).forEach(function (value, key) {
+            if (value) url.searchParams.set(key, value);
+        });
+        panel.setAttribute('data-panel-url', url.pathname + url.search);
+        if (window.dashboardPanels) window.dashboardPanels.reload(panel);
+    });
+    form.querySelector('[name="folder"]').addEventListener('change', function () {
+        form.requestSubmit();
+    });
+
+    // Panel responses carry the current counters
+    panel.addEventListener('panel:loaded', function (event) {
+        var counts = event.detail.counts;
+        if (!counts) return;
+        var badge = document.getElementById('inbox-unread');
+        if (badge) {
+            badge.textContent = counts.unread;
+            badge.classList.toggle('d-none', !counts.unread);
+        }
+        form.querySelectorAll('[name="folder"] option').forEach(function (option) {
+            if (!(option.value in counts)) return;  // folders without a counter
+            var label = option.textContent.replace(/\s*\(\d+\)$/, '');
+            option.textContent = label + ' (' + counts[option.value] + ')';
+        });
+    });
+});
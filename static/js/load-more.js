@@ -0,0 +1,30 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // "Load more" buttons fetch the next keyset page as rendered rows
+    document.addEventListener('click', function (event) {
+        var btn = event.target.closest('[data-load-more-url]');
+        if (!btn) return;
+
+        var target = document.querySelector(btn.getAttribute('data-load-more-target'));
+        if (!target) return;
+
+        btn.disabled = true;
+        fetch(btn.getAttribute('data-load-more-url'), { credentials: 'same-origin' })
+            .then(resp => resp.json())
+            .then(data => {
+                if (!data.success) throw new Error(data.error || 'Failed to load');
+                target.insertAdjacentHTML('beforeend', data.html);
+                if (data.next) {
+                    var url = new URL(btn.getAttribute('data-load-more-url'), window.location.origin);
+                    url.searchParams.set('cursor', data.next);
+                    btn.setAttribute('data-load-more-url', url.pathname + url.search);
+                    btn.disabled = false;
+                } else {
+                    btn.remove();
+                }
+            })
+            .catch(() => {
+                btn.disabled = false;
+                btn.textContent = 'Failed to load - try again';
+            });
+    });
+});
@@ -0,0 +1,21 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Poll background service deletions shown in the services panel
+    if (!document.getElementById('panel-services')) return;
+
+    setInterval(function () {
+        document.querySelectorAll('[data-retirement-url]').forEach(function (badge) {
+            fetch(badge.getAttribute('data-retirement-url'), { credentials: 'same-origin' })
+                .then(resp => resp.json())
+                .then(data => {
+                    if (!data.success) return;
+                    if (data.status === 'done' || data.status === 'failed') {
+                        var panel = document.getElementById('panel-services');
+                        if (window.dashboardPanels) window.dashboardPanels.reload(panel);
+                    } else {
+                        badge.textContent = 'Deleting... ' + data.percent + '%';
+                    }
+                })
+                .catch(() => {});
+        });
+    }, 3000);
+});